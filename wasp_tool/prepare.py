@@ -1,12 +1,15 @@
 """
 This module pulls and prepares data from the specified site(s) of interest. The
-data is written to the AWS bucket.
+data is written to the AWS bucket as versioned snapshots listed in manifest.json.
 """
 import argparse
+import math
 import os
 import sys
 import time
+from typing import Tuple
 import boto3
+from botocore.config import Config
 from wasp_tool import utilities
 import pandas as pd
 from config import KEY,SECRET_KEY,BUCKET_NAME
@@ -22,8 +25,13 @@ DIGITAL_OCEAN_CLIENT = session.client(
     endpoint_url="https://newsatbucket.nyc3.digitaloceanspaces.com",
     aws_access_key_id=KEY,
     aws_secret_access_key=SECRET_KEY,
+    # one connection per concurrent upload
+    config=Config(max_pool_connections=utilities.MAX_UPLOAD_WORKERS),
 )
 
+# define whether a parquet file is written next to each csv file, set by --parquet
+WRITE_PARQUET = False
+
 
 def create_s3_bucket(client):
     """
@@ -71,10 +79,19 @@ def get_altervista_data():
     """
     print("Getting altervista data")
     altervista_data = utilities.prepare_altervista()
+    utilities.report_cache_stats("altervista")
+    utilities.report_failures("altervista")
     utilities.save_df_to_csv(
-        BUCKET_NAME, DIGITAL_OCEAN_CLIENT, altervista_data, "altervista.csv")
-    utilities.save_pdfs(DIGITAL_OCEAN_CLIENT, BUCKET_NAME,
-                        altervista_data["Primary Satellite"].to_list(), altervista_data)
+        BUCKET_NAME, DIGITAL_OCEAN_CLIENT, altervista_data, "altervista.csv", WRITE_PARQUET
+    )
+    frequency_plans = utilities.download_frequency_plans(altervista_data)
+    utilities.publish_frequency_plans(
+        DIGITAL_OCEAN_CLIENT, BUCKET_NAME, altervista_data, frequency_plans
+    )
+    utilities.publish_transponders(
+        DIGITAL_OCEAN_CLIENT, BUCKET_NAME, altervista_data, frequency_plans, WRITE_PARQUET
+    )
+    utilities.report_failures("altervista")
 
 
 @measure_time
@@ -83,13 +100,16 @@ def get_celestrak_data():
     Retrieve data obtained from celestrak.com and write to the AWS bucket
     """
     celestrak_data = utilities.prepare_celestrak()
+    utilities.report_cache_stats("celestrak")
+    utilities.report_failures("celestrak")
 
     """
     Turn dict into df by indexing then flattening
     """
     print("Getting celestrak data")
     utilities.save_df_to_csv(
-        BUCKET_NAME, DIGITAL_OCEAN_CLIENT, celestrak_data, "celestrak.csv")
+        BUCKET_NAME, DIGITAL_OCEAN_CLIENT, celestrak_data, "celestrak.csv", WRITE_PARQUET
+    )
 
 
 @measure_time
@@ -99,12 +119,20 @@ def get_lyngsat_data():
     Retrieve data obtained from lyngsat.com and write to the AWS bucket
     """
     print("Getting lyngsat data")
-    utilities.prepare_lyngsat()
     lyngsat_data, lyngsat_tables = utilities.prepare_lyngsat()
+    utilities.report_cache_stats("lyngsat")
+    utilities.report_failures("lyngsat")
     lyngsat_data_df = pd.DataFrame(lyngsat_data)
-    utilities.save_df_to_csv(
-        BUCKET_NAME, DIGITAL_OCEAN_CLIENT, lyngsat_data_df, "lyngsat.csv")
-    utilities.save_tables(DIGITAL_OCEAN_CLIENT,BUCKET_NAME, lyngsat_tables)
+    # publish the satellites and their channels tables in one snapshot
+    utilities.publish_snapshot(
+        DIGITAL_OCEAN_CLIENT,
+        BUCKET_NAME,
+        {
+            **utilities.get_csv_objects(lyngsat_data_df, "lyngsat.csv", WRITE_PARQUET),
+            **utilities.get_table_objects(lyngsat_tables, WRITE_PARQUET),
+        },
+        "lyngsat",
+    )
 
 
 @measure_time
@@ -115,43 +143,106 @@ def get_satbeams_data():
     """
     print("Getting satbeams data")
     satbeams_data = utilities.prepare_satbeams()
+    utilities.report_cache_stats("satbeams")
+    utilities.report_failures("satbeams")
     utilities.save_df_to_csv(
-        BUCKET_NAME, DIGITAL_OCEAN_CLIENT, satbeams_data, "satbeams.csv")
+        BUCKET_NAME, DIGITAL_OCEAN_CLIENT, satbeams_data, "satbeams.csv", WRITE_PARQUET
+    )
+    utilities.mirror_footprints(
+        DIGITAL_OCEAN_CLIENT, BUCKET_NAME, utilities.get_footprint_urls(satbeams_data)
+    )
+    utilities.report_failures("footprints")
+
 
 
+def parse_interval(value: str) -> Tuple[str, float]:
+    """
+    Parses a --interval value of the form SOURCE=HOURS.
+
+    Parameters
+    ----------
+    value: str
+        String containing the source name and refresh interval in hours
+
+    Returns
+    -------
+    Tuple[str, float]
+
+    source: str
+        Name of the source
+    seconds: float
+        Refresh interval in seconds
+    """
+    source, separator, hours = value.partition("=")
+    if not separator or not source:
+        raise argparse.ArgumentTypeError(f"expected SOURCE=HOURS, got {value!r}")
+    try:
+        hours = float(hours)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of hours in {value!r}") from None
+    if not math.isfinite(hours) or hours <= 0:
+        raise argparse.ArgumentTypeError(
+            f"hours must be a finite number greater than 0 in {value!r}"
+        )
+    return source, hours * 60 * 60
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--site",
         nargs="+",
-        help="Options: altervista, celestrak, lyngsat, satbeams and/or all",
+        help="Options: altervista, celestrak, lyngsat, satbeams, all and/or runbackend",
         required=True,
     )
+    parser.add_argument(
+        "--interval",
+        nargs="+",
+        type=parse_interval,
+        default=[],
+        metavar="SOURCE=HOURS",
+        help="Refresh interval of a source in runbackend mode, e.g. celestrak=2",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Maximum number of sources refreshed at once, defaults to every source",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Also write each dataset as a parquet file next to its csv file",
+    )
 
 
     parser_args = parser.parse_args()
-
+    WRITE_PARQUET = parser_args.parquet
+
+    source_jobs = {
+        "celestrak": get_celestrak_data,
+        "lyngsat": get_lyngsat_data,
+        "satbeams": get_satbeams_data,
+        "altervista": get_altervista_data,
+    }
+    for source, _ in parser_args.interval:
+        if source not in source_jobs:
+            parser.error(
+                f"unknown source {source!r} in --interval, options: {', '.join(source_jobs)}"
+            )
     if "all" in parser_args.site:
-        get_celestrak_data()
-        get_lyngsat_data()
-        get_satbeams_data()
-        get_altervista_data()
-        sys.exit()
-    if "altervista" in parser_args.site:
-        get_altervista_data()
-    if "celestrak" in parser_args.site:
-        get_celestrak_data()
-    if "lyngsat" in parser_args.site:
-        get_lyngsat_data()
-    if "satbeams" in parser_args.site:
-        get_satbeams_data()
+        # the sources share no state, run them concurrently
+        results = utilities.run_sources(source_jobs, parser_args.max_workers)
+        sys.exit(any(error is not None for _, error in results.values()))
+    selected_jobs = {
+        source: job for source, job in source_jobs.items() if source in parser_args.site
+    }
+    if selected_jobs:
+        utilities.run_sources(selected_jobs, parser_args.max_workers)
     if "runbackend" in parser_args.site:
-        while True:
-            get_satbeams_data()
-            get_altervista_data()
-            #get_lyngsat_data()
-            get_celestrak_data()
-            time.sleep(3600)
+        # refresh each source on its own interval
+        intervals = dict(parser_args.interval)
+        schedule = utilities.create_schedule(source_jobs, intervals)
+        utilities.run_schedule(schedule, parser_args.max_workers)
  
 
@@ -1,5 +1,15 @@
 from wasp_tool.utilities.altervista_utilities import *
 from wasp_tool.utilities.celestrak_utilities import *
+from wasp_tool.utilities.checkpoint_utilities import *
+from wasp_tool.utilities.crawl_utilities import *
+from wasp_tool.utilities.fingerprint_utilities import *
+from wasp_tool.utilities.footprint_utilities import *
+from wasp_tool.utilities.frequency_plan_utilities import *
+from wasp_tool.utilities.http_utilities import *
 from wasp_tool.utilities.lyngsat_utilities import *
+from wasp_tool.utilities.parse_utilities import *
 from wasp_tool.utilities.prepare_utilities import *
+from wasp_tool.utilities.publish_utilities import *
 from wasp_tool.utilities.satbeams_utilities import *
+from wasp_tool.utilities.schedule_utilities import *
+from wasp_tool.utilities.transponder_utilities import *
@@ -20,11 +20,10 @@ FUNCTIONS
 import sys
 from typing import Tuple
 import numpy as np
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
-#from wasp_tool import utilities
+from wasp_tool import utilities
 
 ALTERVISTA_HOMEPAGE = "http://frequencyplansatellites.altervista.org/"
 
@@ -55,18 +54,16 @@ def prepare_altervista() -> Tuple[dict, list]:
     print(len(sat_names))
     print(len(freq_plans))
 
-    df = pd.DataFrame(columns=["Primary Satellite",  "Frequency Plan URL"])
-   
-    for index in range(num_satellites):
-        data = {
-            "Primary Satellite": [sat_names[index].split("-")[0].split("(")[0].rstrip()],
-            "Frequency Plan URL": [freq_plans[index]]
-
-        }
-
-        newdf = pd.DataFrame(data)
-        df = pd.concat([df, newdf])
-
+    # primary name is the text before any "-" or "(" delimiter
+    primary_names = (
+        pd.Series(sat_names, dtype=object)
+        .str.split("-").str[0]
+        .str.split("(").str[0]
+        .str.rstrip()
+    )
+    df = pd.DataFrame(
+        {"Primary Satellite": primary_names, "Frequency Plan URL": freq_plans}
+    )
     return df
 
 
@@ -79,8 +76,8 @@ def get_constellation_urls() -> list:
     urls: list
         List of urls for each satellite constellation subpage
     """
-    http_response = requests.get(ALTERVISTA_HOMEPAGE)  
-    if http_response.status_code == HTTP_SUCCESS:
+    http_response = utilities.fetch(ALTERVISTA_HOMEPAGE, "altervista")
+    if http_response is not None and http_response.status_code == HTTP_SUCCESS:
         soup = BeautifulSoup(http_response.text, "lxml")
         http_response.close()
         sidebar = soup.find("div", id="sidebar")
@@ -98,10 +95,12 @@ def get_frequency_plans(constellation_urls: list) -> Tuple[list, list, list]:
     For each satellite in a given constellation, appends the primary satellite names,
     secondary satellite name(s), and frequency plan PDF link to separate lists.
 
+    The constellation subpages are fetched concurrently.
+
     Parameters
     ----------
-    url: str
-        String containing the url of a given satellite constellation subpage
+    constellation_urls: list
+        List of urls for each satellite constellation subpage
 
     Returns
     -------
@@ -118,22 +117,24 @@ def get_frequency_plans(constellation_urls: list) -> Tuple[list, list, list]:
     sat_names = []
     freq_plans = []
 
+    # fetch all constellation subpages concurrently
+    constellation_pages = dict(
+        utilities.crawl(dict(zip(constellation_urls, constellation_urls)), "altervista")
+    )
     for url in constellation_urls:
-        http_response = requests.get(url)  # Heroku has specified timeout
-        if http_response.status_code == HTTP_SUCCESS:
-            soup = BeautifulSoup(http_response.text, "lxml")
-            http_response.close()
-            sidebar = soup.find("div", id="sidebar")
-
-            for a in sidebar.find_all("a", href=True):
-                if ".pdf" in a["href"]:
-                    num_satellites += 1
-                    sat_names.append(a.text)
-                    freq_plans.append(a["href"])
+        content = constellation_pages[url]
+        if content is None:
+            # the failure is recorded in the run failure report, keep the other subpages
+            print("Unsuccessful request at ", url)
             continue
-        print("Unsuccessful request at ", url)
-        print("Exiting script...")
-        sys.exit()
+        soup = BeautifulSoup(content, "lxml")
+        sidebar = soup.find("div", id="sidebar")
+
+        for a in sidebar.find_all("a", href=True):
+            if ".pdf" in a["href"]:
+                num_satellites += 1
+                sat_names.append(a.text)
+                freq_plans.append(a["href"])
     return num_satellites, sat_names, freq_plans
 
 
@@ -14,9 +14,7 @@ FUNCTIONS
 import sys
 
 import numpy as np
-import requests
 import pandas as pd
-import re
 
 from wasp_tool import utilities
 
@@ -36,9 +34,9 @@ def prepare_celestrak() -> dict:
     data_dictionary: dict
         Dictionary of lists containing all satellites primary names, secondary names, and TLEs.
     """
-    response = requests.get(CELESTRAK_HOMEPAGE) 
+    response = utilities.fetch(CELESTRAK_HOMEPAGE, "celestrak")
 
-    if response.status_code == HTTP_SUCCESS:
+    if response is not None and response.status_code == HTTP_SUCCESS:
         html_text = response.text.split("\n")
         celestrak_data = get_tles(html_text)
         return celestrak_data
@@ -47,11 +45,14 @@ def prepare_celestrak() -> dict:
     sys.exit()
 
 
-def get_tles(html_text: list) -> np.array:
+def get_tles(html_text: list) -> pd.DataFrame:
     """
     Extracts primary satellite name, secondary satellite name(s), and TLEs from
     the given html text.
 
+    The 3-line records are reshaped into rows in a single pass so the cost grows
+    linearly with the size of the CelesTrak group.
+
     Parameters
     ----------
     html_text: list
@@ -59,39 +60,20 @@ def get_tles(html_text: list) -> np.array:
 
     Returns
     -------
-    data_dictionary: dict
-        Dictionary of lists containing all satellites primary names, secondary names, and TLEs.
+    df: pd.DataFrame
+        Dataframe containing all satellites primary names, TLEs, and NORAD numbers.
     """
     line_count = 3  # every third line break begins TLEs for new sat
-    num_satellites = int(len(html_text)/3)
+    num_satellites = len(html_text) // line_count
     print("NUM SATS", num_satellites)
-    celestrak_data = np.empty((num_satellites, 3, 1), dtype=object)
-    print(celestrak_data[0, 0, 0])
-
-    # iterate through lines to get sat names and corresponding TLEs
-    index = 0
-
-    df = pd.DataFrame(columns=['Primary Satellite', 'TLE-1', 'TLE-2'])
-
-    for i, line in enumerate(html_text):
-        if (i % line_count == 0) and (i <= (len(html_text) - line_count)):
-            # separate out TLEs
-            tle_line_1 = html_text[i + 1].strip().replace(" ", "*")
-            tle_line_2 = html_text[i + 2].strip().replace(" ", "*")
-
-
-           
-            sat_names = line.strip()
-            norad_number = tle_line_2[2:7]
-            data = {
-                "Primary Satellite": [sat_names],
-                "TLE-1": [tle_line_1],
-                "TLE-2": [tle_line_2],
-                "Norad" :[norad_number]
-            }
-            
-            newdf = pd.DataFrame(data)
-            df = pd.concat([df,newdf])
 
-            index += 1
+    # one row per satellite: name, TLE line 1, TLE line 2
+    records = np.array(
+        [line.strip() for line in html_text[: num_satellites * line_count]], dtype=object
+    ).reshape(num_satellites, line_count)
+    df = pd.DataFrame(records, columns=["Primary Satellite", "TLE-1", "TLE-2"])
+    # separate out TLEs
+    df["TLE-1"] = df["TLE-1"].str.replace(" ", "*", regex=False)
+    df["TLE-2"] = df["TLE-2"].str.replace(" ", "*", regex=False)
+    df["Norad"] = df["TLE-2"].str[2:7]
     return df
@@ -0,0 +1,123 @@
+"""
+This module defines checkpoints that persist the progress of a long run entry by entry,
+so a run that dies partway through can resume with only the remaining work.
+
+FUNCTIONS
+    def load_checkpoint(name: str) -> dict:
+        Loads every entry recorded in a checkpoint by an unfinished run.
+    def save_checkpoint_entry(name: str, key: str, value: object):
+        Records a completed entry in a checkpoint.
+    def clear_checkpoint(name: str):
+        Removes a checkpoint once its run has completed.
+    def get_checkpoint_path(name: str) -> Path:
+        Return the directory of a checkpoint.
+"""
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from wasp_tool.utilities.utilities import create_directory, get_project_path
+
+# define directory holding checkpoints
+CHECKPOINT_DIRECTORY = get_project_path().joinpath(".wasp_cache", "checkpoints")
+
+# define age in seconds after which an unfinished checkpoint is discarded
+CHECKPOINT_MAX_AGE = 24 * 60 * 60
+
+
+def load_checkpoint(name: str) -> dict:
+    """
+    Loads every entry recorded in a checkpoint by an unfinished run.
+
+    Checkpoints older than CHECKPOINT_MAX_AGE are discarded rather than resumed.
+
+    Parameters
+    ----------
+    name: str
+        Name of the checkpoint (e.g. "lyngsat")
+
+    Returns
+    -------
+    checkpoint: dict
+        Dictionary containing the recorded entries, empty if there is nothing to resume
+    """
+    path = get_checkpoint_path(name)
+    started_path = path.joinpath("started")
+    try:
+        age = time.time() - started_path.stat().st_mtime
+    except OSError:
+        return {}
+    if age > CHECKPOINT_MAX_AGE:
+        print("Discarding", name, "checkpoint from", round(age / 60 / 60, 1), "hours ago")
+        clear_checkpoint(name)
+        return {}
+
+    checkpoint = {}
+    for entry_path in path.glob("*.pkl"):
+        try:
+            with open(entry_path, "rb") as file:
+                entry = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            continue
+        checkpoint[entry["key"]] = entry["value"]
+    return checkpoint
+
+
+def save_checkpoint_entry(name: str, key: str, value: object):
+    """
+    Records a completed entry in a checkpoint.
+
+    Parameters
+    ----------
+    name: str
+        Name of the checkpoint (e.g. "lyngsat")
+    key: str
+        Key of the entry, e.g. the url the entry was parsed from
+    value: object
+        Picklable result of the entry
+    """
+    path = get_checkpoint_path(name)
+    create_directory(path)
+    started_path = path.joinpath("started")
+    if not started_path.exists():
+        started_path.touch()
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    entry_path = path.joinpath(f"{digest}.pkl")
+    # write to a temporary file first so an interrupted run never leaves a partial entry
+    temporary_path = f"{entry_path}.{threading.get_ident()}.tmp"
+    with open(temporary_path, "wb") as file:
+        pickle.dump({"key": key, "value": value}, file)
+    os.replace(temporary_path, entry_path)
+
+
+def clear_checkpoint(name: str):
+    """
+    Removes a checkpoint once its run has completed.
+
+    Parameters
+    ----------
+    name: str
+        Name of the checkpoint
+    """
+    shutil.rmtree(get_checkpoint_path(name), ignore_errors=True)
+
+
+def get_checkpoint_path(name: str) -> Path:
+    """
+    Return the directory of a checkpoint.
+
+    Parameters
+    ----------
+    name: str
+        Name of the checkpoint
+
+    Returns
+    -------
+    Path
+        Concrete path for the checkpoint directory
+    """
+    return CHECKPOINT_DIRECTORY.joinpath(name)
@@ -0,0 +1,335 @@
+"""
+This module defines an asyncio based engine for fetching many pages concurrently while
+limiting the number of requests in flight against any single host.
+
+The event loop runs in a background thread that hands completed pages to the caller
+through a bounded queue, so fetching continues while the caller processes a page.
+
+FUNCTIONS
+    def crawl(urls: dict, source: str, max_per_host: int) -> Iterator[Tuple[str, bytes]]:
+        Fetches every url and yields (key, content) pairs in the order the pages complete.
+    def run_crawl(
+        urls: dict,
+        source: str,
+        max_per_host: int,
+        results: queue.Queue,
+        stop_event: threading.Event
+    ):
+        Runs a crawl on its own event loop and puts every completed page on a queue.
+    async def feed_queue(
+        urls: dict,
+        source: str,
+        max_per_host: int,
+        results: queue.Queue,
+        stop_event: threading.Event
+    ):
+        Puts every page completed by crawl_async on the queue until the crawl is stopped.
+    def put_result(results: queue.Queue, item: object, stop_event: threading.Event) -> bool:
+        Puts an item on the queue, waiting for space until the crawl is stopped.
+    async def crawl_async(
+        urls: dict, source: str, max_per_host: int
+    ) -> AsyncIterator[Tuple[str, bytes]]:
+        Asynchronous generator yielding (key, content) pairs as the pages complete.
+    async def fetch_page(
+        key: str,
+        url: str,
+        source: str,
+        semaphore: asyncio.Semaphore,
+        executor: ThreadPoolExecutor
+    ) -> Tuple[str, bytes]:
+        Fetches a single page once a slot for its host is available.
+    def fetch_page_content(url: str, source: str) -> bytes:
+        Sends a GET request to the given url and returns the response body.
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator, Tuple
+from urllib.parse import urlparse
+
+from wasp_tool.utilities.http_utilities import fetch, get_session
+
+# define http response success
+HTTP_SUCCESS = 200
+
+# define default number of simultaneous requests sent to a single host
+MAX_REQUESTS_PER_HOST = 8
+
+# define number of completed pages held until the caller takes them
+MAX_QUEUED_PAGES = 64
+
+# define seconds between checks for a stopped crawl while the queue is full
+QUEUE_POLL_INTERVAL = 0.1
+
+# define marker put on the queue once every page has been fetched
+CRAWL_DONE = object()
+
+
+def crawl(
+    urls: dict, source: str, max_per_host: int = MAX_REQUESTS_PER_HOST
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Fetches every url and yields (key, content) pairs in the order the pages complete.
+
+    Pages are fetched in a background thread, which waits only once MAX_QUEUED_PAGES
+    completed pages have not been taken. Closing the generator early stops the crawl and
+    waits for the requests in flight, so no fetch outlives the call.
+
+    Parameters
+    ----------
+    urls: dict
+        Dictionary of urls to fetch
+        key: identifier returned alongside the page content
+        value: url
+    source: str
+        Name of the site the urls belong to, used for cache hit/miss counts
+    max_per_host: int
+        Maximum number of simultaneous requests sent to a single host
+
+    Yields
+    ------
+    Tuple[str, bytes]
+
+    key: str
+        Identifier of the fetched url
+    content: bytes
+        Page content, None if every attempt failed
+    """
+    results = queue.Queue(maxsize=MAX_QUEUED_PAGES)
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=run_crawl,
+        args=(urls, source, max_per_host, results, stop_event),
+        name=f"crawl-{source}",
+        daemon=True,
+    )
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is CRAWL_DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
+        thread.join()
+
+
+def run_crawl(
+    urls: dict,
+    source: str,
+    max_per_host: int,
+    results: queue.Queue,
+    stop_event: threading.Event,
+):
+    """
+    Runs a crawl on its own event loop and puts every completed page on a queue.
+
+    CRAWL_DONE is put on the queue once every page has been fetched, or the exception
+    that ended the crawl.
+
+    Parameters
+    ----------
+    urls: dict
+        Dictionary of urls to fetch
+    source: str
+        Name of the site the urls belong to
+    max_per_host: int
+        Maximum number of simultaneous requests sent to a single host
+    results: queue.Queue
+        Queue receiving the (key, content) pairs
+    stop_event: threading.Event
+        Event set by the caller once it stops taking pages
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(feed_queue(urls, source, max_per_host, results, stop_event))
+        put_result(results, CRAWL_DONE, stop_event)
+    except Exception as error:  # pylint: disable=broad-except
+        put_result(results, error, stop_event)
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+
+async def feed_queue(
+    urls: dict,
+    source: str,
+    max_per_host: int,
+    results: queue.Queue,
+    stop_event: threading.Event,
+):
+    """
+    Puts every page completed by crawl_async on the queue until the crawl is stopped.
+
+    Waiting for space on the queue happens off the event loop, so requests in flight
+    keep completing meanwhile.
+
+    Parameters
+    ----------
+    urls: dict
+        Dictionary of urls to fetch
+    source: str
+        Name of the site the urls belong to
+    max_per_host: int
+        Maximum number of simultaneous requests sent to a single host
+    results: queue.Queue
+        Queue receiving the (key, content) pairs
+    stop_event: threading.Event
+        Event set by the caller once it stops taking pages
+    """
+    pages = crawl_async(urls, source, max_per_host)
+    try:
+        async for page in pages:
+            if not await asyncio.to_thread(put_result, results, page, stop_event):
+                break
+    finally:
+        await pages.aclose()
+
+
+def put_result(results: queue.Queue, item: object, stop_event: threading.Event) -> bool:
+    """
+    Puts an item on the queue, waiting for space until the crawl is stopped.
+
+    Parameters
+    ----------
+    results: queue.Queue
+        Queue receiving the item
+    item: object
+        Item to put on the queue
+    stop_event: threading.Event
+        Event set by the caller once it stops taking pages
+
+    Returns
+    -------
+    bool
+        True if the item was put on the queue, False if the crawl was stopped first
+    """
+    while not stop_event.is_set():
+        try:
+            results.put(item, timeout=QUEUE_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+async def crawl_async(
+    urls: dict, source: str, max_per_host: int = MAX_REQUESTS_PER_HOST
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """
+    Asynchronous generator yielding (key, content) pairs as the pages complete.
+
+    Parameters
+    ----------
+    urls: dict
+        Dictionary of urls to fetch
+        key: identifier returned alongside the page content
+        value: url
+    source: str
+        Name of the site the urls belong to, used for cache hit/miss counts
+    max_per_host: int
+        Maximum number of simultaneous requests sent to a single host
+
+    Yields
+    ------
+    Tuple[str, bytes]
+
+    key: str
+        Identifier of the fetched url
+    content: bytes
+        Page content, None if every attempt failed
+    """
+    if not urls:
+        return
+    # one semaphore per host bounds the requests in flight against that host
+    semaphores = {}
+    for url in urls.values():
+        host = urlparse(url).netloc
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(max_per_host)
+
+    # keep a connection alive for every request in flight against a host
+    get_session(max_per_host)
+    # blocking requests run in worker threads, sized so no host waits on another
+    executor = ThreadPoolExecutor(max_workers=max_per_host * len(semaphores))
+    tasks = [
+        asyncio.ensure_future(
+            fetch_page(key, url, source, semaphores[urlparse(url).netloc], executor)
+        )
+        for key, url in urls.items()
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        # requests already running complete, so no fetch thread outlives the crawl
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+async def fetch_page(
+    key: str,
+    url: str,
+    source: str,
+    semaphore: asyncio.Semaphore,
+    executor: ThreadPoolExecutor,
+) -> Tuple[str, bytes]:
+    """
+    Fetches a single page once a slot for its host is available.
+
+    Parameters
+    ----------
+    key: str
+        Identifier of the url
+    url: str
+        String containing url to send GET request to
+    source: str
+        Name of the site the url belongs to
+    semaphore: asyncio.Semaphore
+        Semaphore limiting the requests in flight against the url's host
+    executor: ThreadPoolExecutor
+        Executor running the blocking request
+
+    Returns
+    -------
+    Tuple[str, bytes]
+
+    key: str
+        Identifier of the fetched url
+    content: bytes
+        Page content, None if every attempt failed
+    """
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(executor, fetch_page_content, url, source)
+    return key, content
+
+
+def fetch_page_content(url: str, source: str) -> bytes:
+    """
+    Sends a GET request to the given url and returns the response body.
+
+    Retries, timeouts and failure reporting follow the shared fetch policy.
+
+    Parameters
+    ----------
+    url: str
+        String containing url to send GET request to
+    source: str
+        Name of the site the url belongs to
+
+    Returns
+    -------
+    content: bytes
+        Response body, None if every attempt failed
+    """
+    http_response = fetch(url, source)
+    # Check if the status_code is 200
+    if http_response is not None and http_response.status_code == HTTP_SUCCESS:
+        return http_response.content
+    return None
@@ -0,0 +1,121 @@
+"""
+This module defines a persistent store of content fingerprints and the results parsed from
+that content, so unchanged inputs can reuse the previous run's result.
+
+FUNCTIONS
+    def compute_fingerprint(parts: list) -> str:
+        Computes a content hash over the string form of each part.
+    def load_fingerprint(store: str, key: str) -> Tuple[str, object]:
+        Loads the fingerprint and parsed result recorded for a given key.
+    def save_fingerprint(store: str, key: str, fingerprint: str, result: object):
+        Records the fingerprint and parsed result for a given key.
+    def get_fingerprint_path(store: str, key: str) -> Path:
+        Return the path of the fingerprint entry for a given key.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Tuple
+
+from wasp_tool.utilities.utilities import create_directory, get_project_path
+
+# define directory holding fingerprint stores
+FINGERPRINT_DIRECTORY = get_project_path().joinpath(".wasp_cache", "fingerprints")
+
+
+def compute_fingerprint(parts: list) -> str:
+    """
+    Computes a content hash over the string form of each part.
+
+    Parameters
+    ----------
+    parts: list
+        List of objects (e.g. html tables) whose content defines the fingerprint
+
+    Returns
+    -------
+    str
+        Hex digest of the content hash
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode("utf-8")
+        digest.update(part)
+        # separate parts so moving content between them changes the fingerprint
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def load_fingerprint(store: str, key: str) -> Tuple[str, object]:
+    """
+    Loads the fingerprint and parsed result recorded for a given key.
+
+    Parameters
+    ----------
+    store: str
+        Name of the fingerprint store (e.g. "lyngsat")
+    key: str
+        Key of the entry, e.g. the url the content was fetched from
+
+    Returns
+    -------
+    Tuple[str, object]
+
+    fingerprint: str
+        Recorded fingerprint, None if the key has no entry
+    result: object
+        Recorded parsed result, None if the key has no entry
+    """
+    try:
+        with open(get_fingerprint_path(store, key), "rb") as file:
+            entry = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None, None
+    return entry["fingerprint"], entry["result"]
+
+
+def save_fingerprint(store: str, key: str, fingerprint: str, result: object):
+    """
+    Records the fingerprint and parsed result for a given key.
+
+    Parameters
+    ----------
+    store: str
+        Name of the fingerprint store (e.g. "lyngsat")
+    key: str
+        Key of the entry, e.g. the url the content was fetched from
+    fingerprint: str
+        Fingerprint of the content
+    result: object
+        Picklable result parsed from the content
+    """
+    path = get_fingerprint_path(store, key)
+    create_directory(path.parent)
+    # write to a temporary file first so an interrupted run never leaves a partial entry
+    temporary_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary_path, "wb") as file:
+        pickle.dump({"key": key, "fingerprint": fingerprint, "result": result}, file)
+    os.replace(temporary_path, path)
+
+
+def get_fingerprint_path(store: str, key: str) -> Path:
+    """
+    Return the path of the fingerprint entry for a given key.
+
+    Parameters
+    ----------
+    store: str
+        Name of the fingerprint store
+    key: str
+        Key of the entry
+
+    Returns
+    -------
+    Path
+        Concrete path for the entry
+    """
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return FINGERPRINT_DIRECTORY.joinpath(store, f"{digest}.pkl")
@@ -0,0 +1,242 @@
+"""
+This module mirrors satbeams footprint images to the AWS bucket, so the dashboard serves
+them from our own storage instead of linking to satbeams.com.
+
+Images are stored by the sha256 hash of their content next to a thumbnail, and the
+footprint index maps each satbeams image url to its stored image. Images mirrored by a
+previous run are not downloaded again until they are FOOTPRINT_REFRESH_AGE old, and
+refreshed images whose content did not change are not uploaded again.
+
+FUNCTIONS
+    def mirror_footprints(
+        aws_client: botocore.client, aws_bucket: str, urls: list, max_workers: int
+    ) -> dict:
+        Downloads every footprint image not mirrored yet and uploads it with its thumbnail.
+    def download_footprint(url: str) -> Tuple[bytes, bytes]:
+        Downloads a footprint image and creates its thumbnail.
+    def create_thumbnail(body: bytes) -> bytes:
+        Return a jpeg thumbnail of an image.
+    def load_footprint_index(aws_client: botocore.client, aws_bucket: str) -> dict:
+        Loads the footprint index published by a previous run.
+    def get_footprint_urls(satbeams_data: pd.DataFrame) -> list:
+        Return the footprint image urls of every satellite.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+from typing import Tuple
+
+import botocore
+import pandas as pd
+from PIL import Image, UnidentifiedImageError
+
+from wasp_tool.utilities.http_utilities import fetch
+from wasp_tool.utilities.publish_utilities import (
+    load_published_object,
+    publish_snapshot,
+    upload_objects,
+)
+
+# define http response success
+HTTP_SUCCESS = 200
+
+# define number of simultaneous image downloads
+MAX_IMAGE_WORKERS = 8
+
+# define key of the footprint index
+FOOTPRINT_INDEX_KEY = "footprints_index.json"
+
+# define key prefixes of the mirrored images and their thumbnails
+FOOTPRINT_PREFIX = "footprints/images/"
+THUMBNAIL_PREFIX = "footprints/thumbnails/"
+
+# define largest width and height of a thumbnail in pixels
+THUMBNAIL_SIZE = (320, 320)
+
+# define age in seconds after which a mirrored image is downloaded again
+FOOTPRINT_REFRESH_AGE = 30 * 24 * 60 * 60
+
+# define upload arguments of mirrored images, their keys never change content
+IMAGE_EXTRA_ARGS = {
+    "ContentType": "image/jpeg",
+    "CacheControl": "public, max-age=31536000, immutable",
+}
+
+
+def mirror_footprints(
+    aws_client: botocore.client,
+    aws_bucket: str,
+    urls: list,
+    max_workers: int = MAX_IMAGE_WORKERS,
+) -> dict:
+    """
+    Downloads every footprint image not mirrored yet and uploads it with its thumbnail.
+
+    Images are downloaded and thumbnailed concurrently. The footprint index is published
+    once every image has been uploaded. Images that fail to download keep their previous
+    index entry.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    urls: list
+        List of footprint image urls
+    max_workers: int
+        Number of simultaneous image downloads
+
+    Returns
+    -------
+    footprint_index: dict
+        Dictionary containing the stored image of each url
+        key: footprint image url
+        value: dictionary of the image's sha256 hash, image key, thumbnail key and the
+        time it was mirrored
+    """
+    previous_index = load_footprint_index(aws_client, aws_bucket)
+    now = time.time()
+    urls = list(dict.fromkeys(urls))
+    footprint_index = {}
+    stale_urls = []
+    for url in urls:
+        entry = previous_index.get(url)
+        if entry is not None and now - entry["mirrored"] < FOOTPRINT_REFRESH_AGE:
+            footprint_index[url] = entry
+        else:
+            stale_urls.append(url)
+    print("Mirroring", len(stale_urls), "of", len(urls), "footprint images")
+
+    known_digests = {entry["sha256"] for entry in previous_index.values()}
+    objects = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(download_footprint, url): url for url in stale_urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            image, thumbnail = future.result()
+            if image is None:
+                if url in previous_index:
+                    footprint_index[url] = previous_index[url]
+                continue
+            digest = hashlib.sha256(image).hexdigest()
+            footprint_index[url] = {
+                "sha256": digest,
+                "image": f"{FOOTPRINT_PREFIX}{digest}.jpg",
+                "thumbnail": f"{THUMBNAIL_PREFIX}{digest}.jpg",
+                "mirrored": now,
+            }
+            # content addressed objects already in the bucket are never uploaded again
+            if digest not in known_digests:
+                objects[footprint_index[url]["image"]] = image
+                objects[footprint_index[url]["thumbnail"]] = thumbnail
+                known_digests.add(digest)
+
+    stats = upload_objects(aws_client, aws_bucket, objects, extra_args=IMAGE_EXTRA_ARGS)
+    failed_keys = set(stats["failed"])
+    for url, entry in list(footprint_index.items()):
+        if entry["image"] in failed_keys or entry["thumbnail"] in failed_keys:
+            del footprint_index[url]
+    body = json.dumps(footprint_index, sort_keys=True).encode("utf-8")
+    publish_snapshot(aws_client, aws_bucket, {FOOTPRINT_INDEX_KEY: body}, "footprints")
+    return footprint_index
+
+
+def download_footprint(url: str) -> Tuple[bytes, bytes]:
+    """
+    Downloads a footprint image and creates its thumbnail.
+
+    Parameters
+    ----------
+    url: str
+        String containing footprint image url
+
+    Returns
+    -------
+    Tuple[bytes, bytes]
+
+    image: bytes
+        Bytes of the image, None if it could not be downloaded or read
+    thumbnail: bytes
+        Bytes of the jpeg thumbnail, None if the image could not be downloaded or read
+    """
+    response = fetch(url, "footprints")
+    if response is None or response.status_code != HTTP_SUCCESS:
+        return None, None
+    try:
+        thumbnail = create_thumbnail(response.content)
+    except (UnidentifiedImageError, OSError) as error:
+        print("Unable to read footprint image", url, repr(error))
+        return None, None
+    return response.content, thumbnail
+
+
+def create_thumbnail(body: bytes) -> bytes:
+    """
+    Return a jpeg thumbnail of an image.
+
+    Parameters
+    ----------
+    body: bytes
+        Bytes of the image
+
+    Returns
+    -------
+    bytes
+        Bytes of the thumbnail, at most THUMBNAIL_SIZE pixels with the image's aspect ratio
+    """
+    with Image.open(BytesIO(body)) as image:
+        image.draft("RGB", THUMBNAIL_SIZE)
+        image = image.convert("RGB")
+        image.thumbnail(THUMBNAIL_SIZE)
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=80, optimize=True)
+    return buffer.getvalue()
+
+
+def load_footprint_index(aws_client: botocore.client, aws_bucket: str) -> dict:
+    """
+    Loads the footprint index published by a previous run.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+
+    Returns
+    -------
+    dict
+        Dictionary containing the stored image of each url, empty if no index was
+        published
+    """
+    body = load_published_object(aws_client, aws_bucket, FOOTPRINT_INDEX_KEY)
+    if body is None:
+        return {}
+    return json.loads(body)
+
+
+def get_footprint_urls(satbeams_data: pd.DataFrame) -> list:
+    """
+    Return the footprint image urls of every satellite.
+
+    Parameters
+    ----------
+    satbeams_data: pd.DataFrame
+        Dataframe returned by prepare_satbeams, its sixth column holds the list of
+        footprint image urls of each satellite
+
+    Returns
+    -------
+    urls: list
+        List of footprint image urls
+    """
+    urls = []
+    for images in satbeams_data.iloc[:, 5]:
+        # satellites without footprints have no list
+        if isinstance(images, list):
+            urls.extend(images)
+    return urls
@@ -0,0 +1,250 @@
+"""
+This module renders the Altervista frequency plan PDFs to page images stored in the AWS
+bucket, so the dashboard shows them without embedding the remote PDFs.
+
+The PDFs are downloaded concurrently and rendered in worker processes. A PDF is only
+rendered again when its sha256 hash changes, its page images are stored under that hash,
+and the frequency plan index lists the pages of each satellite's plan.
+
+FUNCTIONS
+    def download_frequency_plans(altervista_data: pd.DataFrame, max_per_host: int) -> dict:
+        Downloads the frequency plan PDF of every satellite concurrently.
+    def publish_frequency_plans(
+        aws_client: botocore.client,
+        aws_bucket: str,
+        altervista_data: pd.DataFrame,
+        frequency_plans: dict,
+        max_workers: int
+    ) -> dict:
+        Renders every changed frequency plan and publishes the page images and the index.
+    def render_frequency_plan(content: bytes) -> list:
+        Renders every page of a PDF to a jpeg image.
+    def load_frequency_plan_index(aws_client: botocore.client, aws_bucket: str) -> dict:
+        Loads the frequency plan index published by a previous run.
+"""
+import hashlib
+import json
+import time
+from io import BytesIO
+
+import botocore
+import pandas as pd
+import pypdfium2 as pdfium
+
+from wasp_tool.utilities.crawl_utilities import MAX_REQUESTS_PER_HOST, crawl
+from wasp_tool.utilities.parse_utilities import parse_pages
+from wasp_tool.utilities.publish_utilities import (
+    load_published_object,
+    publish_snapshot,
+    upload_objects,
+)
+
+# define key of the frequency plan index
+FREQUENCY_PLAN_INDEX_KEY = "frequency_plans_index.json"
+
+# define key prefix of the stored PDFs and their page images
+FREQUENCY_PLAN_PREFIX = "frequency_plans/"
+
+# define render scale of PDF pages, 1 renders at 72 dpi
+RENDER_SCALE = 2
+
+# define jpeg quality of rendered pages
+JPEG_QUALITY = 80
+
+# define upload arguments of rendered pages and PDFs, their keys never change content
+PAGE_EXTRA_ARGS = {
+    "ContentType": "image/jpeg",
+    "CacheControl": "public, max-age=31536000, immutable",
+}
+PDF_EXTRA_ARGS = {
+    "ContentType": "application/pdf",
+    "CacheControl": "public, max-age=31536000, immutable",
+}
+
+
+def download_frequency_plans(
+    altervista_data: pd.DataFrame, max_per_host: int = MAX_REQUESTS_PER_HOST
+) -> dict:
+    """
+    Downloads the frequency plan PDF of every satellite concurrently.
+
+    Satellites may share a frequency plan, each PDF is downloaded once.
+
+    Parameters
+    ----------
+    altervista_data: pd.DataFrame
+        Dataframe returned by prepare_altervista
+    max_per_host: int
+        Maximum number of simultaneous requests sent to a host
+
+    Returns
+    -------
+    frequency_plans: dict
+        Dictionary containing every downloaded PDF, PDFs that failed are left out
+        key: frequency plan url
+        value: bytes of the PDF
+    """
+    urls = list(dict.fromkeys(altervista_data["Frequency Plan URL"]))
+    frequency_plans = {}
+    for url, content in crawl(dict(zip(urls, urls)), "altervista", max_per_host):
+        if content is not None:
+            frequency_plans[url] = content
+    return frequency_plans
+
+
+def publish_frequency_plans(
+    aws_client: botocore.client,
+    aws_bucket: str,
+    altervista_data: pd.DataFrame,
+    frequency_plans: dict,
+    max_workers: int = None,
+) -> dict:
+    """
+    Renders every changed frequency plan and publishes the page images and the index.
+
+    PDFs whose hash matches a previously rendered PDF reuse its page images. Each plan
+    is uploaded as soon as it is rendered, so only the plans in flight are held in
+    memory. Satellites whose PDF cannot be downloaded or rendered keep their previous
+    index entry.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    altervista_data: pd.DataFrame
+        Dataframe returned by prepare_altervista
+    frequency_plans: dict
+        Dictionary returned by download_frequency_plans
+    max_workers: int
+        Number of processes rendering PDFs, None uses every core
+
+    Returns
+    -------
+    frequency_plan_index: dict
+        Dictionary containing the rendered frequency plan of each satellite
+        key: satellite's primary name
+        value: dictionary of the PDF's url, sha256 hash and key, and the key, width and
+        height of each page image
+    """
+    previous_index = load_frequency_plan_index(aws_client, aws_bucket)
+    rendered_plans = {entry["sha256"]: entry for entry in previous_index.values()}
+    plan_urls = dict(
+        zip(altervista_data["Primary Satellite"], altervista_data["Frequency Plan URL"])
+    )
+
+    pdfs = {}
+    changed_pdfs = {}
+    for url, content in frequency_plans.items():
+        digest = hashlib.sha256(content).hexdigest()
+        pdfs[url] = digest
+        if digest not in rendered_plans and digest not in changed_pdfs:
+            changed_pdfs[digest] = content
+    print("Rendering", len(changed_pdfs), "of", len(pdfs), "frequency plans")
+
+    start_time = time.time()
+    uploaded_objects = 0
+    uploaded_bytes = 0
+    for digest, pages in parse_pages(changed_pdfs.items(), render_frequency_plan, max_workers):
+        if pages is None:
+            continue
+        pdf_key = f"{FREQUENCY_PLAN_PREFIX}{digest}/plan.pdf"
+        page_objects = {}
+        page_entries = []
+        for number, (image, width, height) in enumerate(pages, start=1):
+            page_key = f"{FREQUENCY_PLAN_PREFIX}{digest}/page-{number}.jpg"
+            page_objects[page_key] = image
+            page_entries.append({"key": page_key, "width": width, "height": height})
+        pdf_stats = upload_objects(
+            aws_client,
+            aws_bucket,
+            {pdf_key: changed_pdfs[digest]},
+            extra_args=PDF_EXTRA_ARGS,
+            report=False,
+        )
+        page_stats = upload_objects(
+            aws_client, aws_bucket, page_objects, extra_args=PAGE_EXTRA_ARGS, report=False
+        )
+        uploaded_objects += pdf_stats["objects"] + page_stats["objects"]
+        uploaded_bytes += pdf_stats["bytes"] + page_stats["bytes"]
+        # a plan missing any of its objects is not published
+        if not pdf_stats["failed"] and not page_stats["failed"]:
+            rendered_plans[digest] = {"sha256": digest, "pdf": pdf_key, "pages": page_entries}
+    print(
+        "Uploaded {:d} frequency plan objects, {:.2f} MB in {:.2f} s".format(
+            uploaded_objects, uploaded_bytes / 1e6, time.time() - start_time
+        )
+    )
+
+    frequency_plan_index = {}
+    for sat, url in plan_urls.items():
+        plan = rendered_plans.get(pdfs.get(url))
+        if plan is not None:
+            frequency_plan_index[sat] = {**plan, "url": url}
+        elif sat in previous_index:
+            frequency_plan_index[sat] = previous_index[sat]
+    body = json.dumps(frequency_plan_index, sort_keys=True).encode("utf-8")
+    publish_snapshot(
+        aws_client, aws_bucket, {FREQUENCY_PLAN_INDEX_KEY: body}, "frequency_plans"
+    )
+    return frequency_plan_index
+
+
+def render_frequency_plan(content: bytes) -> list:
+    """
+    Renders every page of a PDF to a jpeg image.
+
+    Runs in the worker processes of parse_pages, pdfium is not thread safe.
+
+    Parameters
+    ----------
+    content: bytes
+        Bytes of the PDF
+
+    Returns
+    -------
+    pages: list
+        List containing the jpeg bytes, width and height of each page image, None if the
+        PDF cannot be read or rendered
+    """
+    pages = []
+    try:
+        pdf = pdfium.PdfDocument(content)
+        try:
+            for page in pdf:
+                image = page.render(scale=RENDER_SCALE).to_pil().convert("RGB")
+                page.close()
+                buffer = BytesIO()
+                image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+                pages.append((buffer.getvalue(), image.width, image.height))
+        finally:
+            pdf.close()
+    # a plan that cannot be rendered, e.g. one too large for memory, must not stop the others
+    except Exception as error:  # pylint: disable=broad-except
+        print("Unable to render frequency plan", repr(error))
+        return None
+    return pages
+
+
+def load_frequency_plan_index(aws_client: botocore.client, aws_bucket: str) -> dict:
+    """
+    Loads the frequency plan index published by a previous run.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+
+    Returns
+    -------
+    dict
+        Dictionary containing the rendered frequency plan of each satellite, empty if no
+        index was published
+    """
+    body = load_published_object(aws_client, aws_bucket, FREQUENCY_PLAN_INDEX_KEY)
+    if body is None:
+        return {}
+    return json.loads(body)
@@ -0,0 +1,707 @@
+"""
+This module defines the shared http fetch layer: a retry policy with timeouts, exponential
+backoff with jitter and a per-host circuit breaker, on top of a persistent on-disk cache of
+http responses. Cached responses are revalidated with conditional requests so unchanged
+pages are served from disk, and the cache is pruned to an age and size bound. Every
+request is sent through one pooled session per process, so connections are kept alive
+across requests.
+
+FUNCTIONS
+    def fetch(url: str, source: str, **kwargs) -> requests.Response:
+        Sends a GET request under the retry policy and records the failures.
+    def get_backoff_delay(attempt: int, response: requests.Response) -> float:
+        Return the delay before the next attempt, with full jitter.
+    def is_circuit_open(host: str) -> bool:
+        Check if requests to a host are currently blocked by its circuit breaker.
+    def record_request_result(host: str, success: bool):
+        Updates the circuit breaker of a host with the outcome of an attempt.
+    def record_failure(source: str, url: str, attempts: int, error: str):
+        Adds a failed request to the run failure report of a source.
+    def report_failures(source: str) -> list:
+        Prints and resets the run failure report of a source.
+    def cached_get(url: str, source: str, **kwargs) -> requests.Response:
+        Sends a conditional GET request and serves the cached body on a 304 response.
+    def get_session(pool_size: int) -> requests.Session:
+        Return the shared session of this process, growing its connection pools to
+        pool_size connections per host if needed.
+    def create_session(pool_size: int, compress: bool) -> requests.Session:
+        Creates a session with keep-alive connection pools and the shared headers.
+    def load_cached_response(url: str) -> Tuple[dict, bytes]:
+        Loads the cached metadata and body for a given url.
+    def store_cached_response(url: str, response: requests.Response):
+        Writes the validators and body of a response to the cache directory.
+    def refresh_cached_response(
+        url: str, metadata: dict, response: requests.Response
+    ) -> dict:
+        Updates the cached validators and headers of a url from a 304 response.
+    def write_cache_file(path: Path, content: bytes):
+        Replaces a cache file without exposing a partially written file.
+    def prune_cache(max_age: float, max_size: int) -> dict:
+        Removes cache entries that are too old, then the oldest entries until the cache
+        fits its size bound.
+    def prune_cache_if_due():
+        Prunes the cache if CACHE_PRUNE_INTERVAL has passed since the last prune.
+    def build_cached_response(url: str, metadata: dict, body: bytes) -> requests.Response:
+        Rebuilds a response object from cached metadata and body.
+    def get_cache_path(url: str) -> Path:
+        Return the cache path prefix for a given url.
+    def record_cache_result(source: str, hit: bool):
+        Increments the cache hit or miss count for a given source.
+    def report_cache_stats(source: str) -> dict:
+        Prints and resets the cache hit and miss counts for a given source.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from wasp_tool.utilities.utilities import create_directory, get_project_path
+
+# define http response success
+HTTP_SUCCESS = 200
+
+# define http response for an unchanged resource
+HTTP_NOT_MODIFIED = 304
+
+# define directory holding cached responses
+CACHE_DIRECTORY = get_project_path().joinpath(".wasp_cache", "http")
+
+# define time in seconds a cached response is kept after it was last stored or revalidated
+CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+# define largest total size in bytes of the cached responses
+CACHE_MAX_SIZE = 2 * 1024**3
+
+# define shortest time in seconds between two prunes of the cache
+CACHE_PRUNE_INTERVAL = 60 * 60
+
+# define connect and read timeouts in seconds
+REQUEST_TIMEOUT = (10, 30)
+
+# define max number of attempts for each request
+MAX_ATTEMPTS = 5
+
+# define delay in seconds before the first retry, doubled for every further retry
+BACKOFF_BASE = 1
+
+# define longest delay in seconds between attempts
+BACKOFF_MAX = 60
+
+# define http responses that are worth retrying
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# define number of consecutive failed attempts that opens a host's circuit
+CIRCUIT_FAILURE_THRESHOLD = 5
+
+# define time in seconds an open circuit blocks requests before letting one through
+CIRCUIT_RESET_TIMEOUT = 60
+
+# define states of a host's circuit breaker
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+# define User-Agent sent with every request
+USER_AGENT = "WASP/1.0 (+https://github.com/BernieBackcountry/WASP)"
+
+# define whether responses are requested with http compression
+HTTP_COMPRESSION = True
+
+# define default number of kept-alive connections per host
+POOL_SIZE = 10
+
+# define number of hosts whose connection pools are kept
+POOL_HOSTS = 10
+
+# shared session of this process and the size of its connection pools
+SESSION = None
+SESSION_PID = None
+SESSION_POOL_SIZE = 0
+SESSION_LOCK = threading.Lock()
+
+# hit and miss counts for each source
+CACHE_STATS = {}
+CACHE_STATS_LOCK = threading.Lock()
+
+# time of the last prune of the cache
+CACHE_PRUNE_TIME = 0
+CACHE_PRUNE_LOCK = threading.Lock()
+
+# state, consecutive failures and open-until time of each host's circuit breaker
+CIRCUITS = {}
+# failed requests of the current run for each source
+FAILURE_REPORT = {}
+POLICY_LOCK = threading.Lock()
+
+
+def fetch(url: str, source: str, **kwargs) -> requests.Response:
+    """
+    Sends a GET request under the retry policy and records the failures.
+
+    Timeouts, connection errors and responses in RETRY_STATUS_CODES are retried with
+    exponential backoff and jitter. Requests to a host whose circuit breaker is open
+    fail immediately.
+
+    Parameters
+    ----------
+    url: str
+        String containing url to send GET request to
+    source: str
+        Name of the site the request belongs to
+    **kwargs
+        Keyword arguments passed through to cached_get, timeout defaults to
+        REQUEST_TIMEOUT
+
+    Returns
+    -------
+    response: requests.Response
+        Final response, None if no response was received
+    """
+    host = urlparse(url).netloc
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    response = None
+    error = None
+    attempts = 0
+    for attempt in range(MAX_ATTEMPTS):
+        if is_circuit_open(host):
+            error = f"circuit open for {host}"
+            break
+        attempts += 1
+        try:
+            response = cached_get(url, source, **kwargs)
+        except requests.RequestException as exception:
+            response = None
+            error = repr(exception)
+        else:
+            if response.status_code not in RETRY_STATUS_CODES:
+                # the host answered, even if the page itself is missing
+                record_request_result(host, success=True)
+                if response.status_code != HTTP_SUCCESS:
+                    record_failure(source, url, attempts, f"HTTP {response.status_code}")
+                return response
+            error = f"HTTP {response.status_code}"
+        record_request_result(host, success=False)
+        print("Attempt", attempts, "unsuccessful for", url, error)
+        if attempt + 1 < MAX_ATTEMPTS:
+            time.sleep(get_backoff_delay(attempt, response))
+    record_failure(source, url, attempts, error)
+    return response
+
+
+def get_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """
+    Return the shared session of this process, growing its connection pools to
+    pool_size connections per host if needed.
+
+    Parameters
+    ----------
+    pool_size: int
+        Number of connections kept alive per host, e.g. the crawl concurrency
+
+    Returns
+    -------
+    requests.Session
+        Shared session
+    """
+    global SESSION, SESSION_PID, SESSION_POOL_SIZE  # pylint: disable=global-statement
+    with SESSION_LOCK:
+        # a forked process must not share connections with its parent
+        if SESSION is None or SESSION_PID != os.getpid():
+            SESSION_POOL_SIZE = max(pool_size, POOL_SIZE)
+            SESSION = create_session(SESSION_POOL_SIZE)
+            SESSION_PID = os.getpid()
+        elif pool_size > SESSION_POOL_SIZE:
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size)
+            SESSION.mount("https://", adapter)
+            SESSION.mount("http://", adapter)
+            SESSION_POOL_SIZE = pool_size
+        return SESSION
+
+
+def create_session(
+    pool_size: int = POOL_SIZE, compress: bool = HTTP_COMPRESSION
+) -> requests.Session:
+    """
+    Creates a session with keep-alive connection pools and the shared headers.
+
+    Parameters
+    ----------
+    pool_size: int
+        Number of connections kept alive per host
+    compress: bool
+        True to request compressed responses; brotli is offered when the brotli
+        package is installed
+
+    Returns
+    -------
+    session: requests.Session
+        New session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    if not compress:
+        session.headers["Accept-Encoding"] = "identity"
+    else:
+        try:
+            import brotli  # pylint: disable=import-outside-toplevel,unused-import
+
+            session.headers["Accept-Encoding"] = "gzip, deflate, br"
+        except ImportError:
+            session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+def get_backoff_delay(attempt: int, response: requests.Response) -> float:
+    """
+    Return the delay before the next attempt, with full jitter.
+
+    Parameters
+    ----------
+    attempt: int
+        Index of the failed attempt, starting at 0
+    response: requests.Response
+        Response of the failed attempt, None if no response was received
+
+    Returns
+    -------
+    float
+        Delay in seconds
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+    # honour the server's requested delay when it sends one in seconds
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            delay = max(delay, min(BACKOFF_MAX, int(retry_after)))
+    return delay
+
+
+def is_circuit_open(host: str) -> bool:
+    """
+    Check if requests to a host are currently blocked by its circuit breaker.
+
+    Once CIRCUIT_RESET_TIMEOUT has passed the circuit is half-open: the first caller is
+    let through as the single trial request and every other request stays blocked until
+    the trial is recorded. A trial that is never recorded is replaced after another
+    CIRCUIT_RESET_TIMEOUT.
+
+    Parameters
+    ----------
+    host: str
+        Host name
+
+    Returns
+    -------
+    bool
+        True if requests to the host are blocked
+    """
+    with POLICY_LOCK:
+        circuit = CIRCUITS.get(host)
+        if circuit is None or circuit["state"] == CIRCUIT_CLOSED:
+            return False
+        if circuit["open_until"] > time.time():
+            return True
+        # let one trial request through, it holds the circuit until it is recorded
+        circuit["state"] = CIRCUIT_HALF_OPEN
+        circuit["open_until"] = time.time() + CIRCUIT_RESET_TIMEOUT
+        return False
+
+
+def record_request_result(host: str, success: bool):
+    """
+    Updates the circuit breaker of a host with the outcome of an attempt.
+
+    A success closes the circuit. The circuit opens after CIRCUIT_FAILURE_THRESHOLD
+    consecutive failures, and reopens on any failure while it is half-open.
+
+    Parameters
+    ----------
+    host: str
+        Host name
+    success: bool
+        True if the host answered with a response that is not retried
+    """
+    with POLICY_LOCK:
+        circuit = CIRCUITS.setdefault(
+            host, {"state": CIRCUIT_CLOSED, "failures": 0, "open_until": 0}
+        )
+        if success:
+            if circuit["state"] != CIRCUIT_CLOSED:
+                print("Resuming requests to", host)
+            circuit.update(state=CIRCUIT_CLOSED, failures=0, open_until=0)
+            return
+        circuit["failures"] += 1
+        if circuit["state"] == CIRCUIT_HALF_OPEN:
+            print("Pausing requests to", host, "again after a failed trial request")
+        elif circuit["state"] == CIRCUIT_CLOSED:
+            if circuit["failures"] < CIRCUIT_FAILURE_THRESHOLD:
+                return
+            print("Pausing requests to", host, "after", circuit["failures"], "failures")
+        circuit["state"] = CIRCUIT_OPEN
+        circuit["open_until"] = time.time() + CIRCUIT_RESET_TIMEOUT
+
+
+def record_failure(source: str, url: str, attempts: int, error: str):
+    """
+    Adds a failed request to the run failure report of a source.
+
+    Parameters
+    ----------
+    source: str
+        Name of the site the request belongs to
+    url: str
+        String containing url of the failed request
+    attempts: int
+        Number of attempts made
+    error: str
+        Description of the last error
+    """
+    with POLICY_LOCK:
+        FAILURE_REPORT.setdefault(source, []).append(
+            {"url": url, "attempts": attempts, "error": error, "time": time.time()}
+        )
+
+
+def report_failures(source: str) -> list:
+    """
+    Prints and resets the run failure report of a source.
+
+    Parameters
+    ----------
+    source: str
+        Name of the site to report on
+
+    Returns
+    -------
+    failures: list
+        List of dictionaries containing the url, attempts, error and time of each
+        failed request since the last report
+    """
+    with POLICY_LOCK:
+        failures = FAILURE_REPORT.pop(source, [])
+    print(f"{source} failures: {len(failures)} requests")
+    for failure in failures:
+        print(f"    {failure['url']} ({failure['attempts']} attempts): {failure['error']}")
+    return failures
+
+
+def cached_get(url: str, source: str, **kwargs) -> requests.Response:
+    """
+    Sends a conditional GET request and serves the cached body on a 304 response.
+
+    Parameters
+    ----------
+    url: str
+        String containing url to send GET request to
+    source: str
+        Name of the site the request belongs to, used for hit/miss counts
+    **kwargs
+        Keyword arguments passed through to the shared session's get
+
+    Returns
+    -------
+    response: requests.Response
+        Fresh response from the server, or a response rebuilt from the cache
+    """
+    metadata, body = load_cached_response(url)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if metadata:
+        if metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+
+    # Heroku has specified timeout
+    response = get_session().get(url, headers=headers, **kwargs)
+    if response.status_code == HTTP_NOT_MODIFIED and metadata:
+        response.close()
+        record_cache_result(source, hit=True)
+        metadata = refresh_cached_response(url, metadata, response)
+        return build_cached_response(url, metadata, body)
+
+    record_cache_result(source, hit=False)
+    if response.status_code == HTTP_SUCCESS:
+        store_cached_response(url, response)
+    return response
+
+
+def load_cached_response(url: str) -> Tuple[dict, bytes]:
+    """
+    Loads the cached metadata and body for a given url.
+
+    Parameters
+    ----------
+    url: str
+        String containing url of the cached response
+
+    Returns
+    -------
+    Tuple[dict, bytes]
+
+    metadata: dict
+        Dictionary of cached validators and headers, empty if the url is not cached
+    body: bytes
+        Cached response body, None if the url is not cached
+    """
+    path = get_cache_path(url)
+    try:
+        with open(path.with_suffix(".json"), "r", encoding="utf-8") as file:
+            metadata = json.load(file)
+        with open(path.with_suffix(".body"), "rb") as file:
+            body = file.read()
+    except (OSError, ValueError):
+        return {}, None
+    return metadata, body
+
+
+def store_cached_response(url: str, response: requests.Response):
+    """
+    Writes the validators and body of a response to the cache directory.
+
+    Responses without an ETag or Last-Modified header cannot be revalidated and
+    are not stored.
+
+    Parameters
+    ----------
+    url: str
+        String containing url the response was fetched from
+    response: requests.Response
+        Successful response to cache
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not (etag or last_modified):
+        return
+    metadata = {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "encoding": response.encoding,
+        "headers": dict(response.headers),
+    }
+    path = get_cache_path(url)
+    create_directory(path.parent)
+    write_cache_file(path.with_suffix(".body"), response.content)
+    write_cache_file(path.with_suffix(".json"), json.dumps(metadata).encode("utf-8"))
+    prune_cache_if_due()
+
+
+def refresh_cached_response(url: str, metadata: dict, response: requests.Response) -> dict:
+    """
+    Updates the cached validators and headers of a url from a 304 response.
+
+    The server may send new validators with a 304 response, and the entry's age
+    restarts, so an entry that is still revalidated is not pruned.
+
+    Parameters
+    ----------
+    url: str
+        String containing url of the cached response
+    metadata: dict
+        Dictionary of cached validators and headers
+    response: requests.Response
+        304 response to the conditional request
+
+    Returns
+    -------
+    metadata: dict
+        Dictionary of the updated validators and headers
+    """
+    headers = CaseInsensitiveDict(metadata.get("headers", {}))
+    headers.update(response.headers)
+    # the length of a 304 response is not the length of the cached body
+    headers.pop("Content-Length", None)
+    metadata = {
+        **metadata,
+        "etag": response.headers.get("ETag") or metadata.get("etag"),
+        "last_modified": (
+            response.headers.get("Last-Modified") or metadata.get("last_modified")
+        ),
+        "headers": dict(headers),
+    }
+    path = get_cache_path(url)
+    try:
+        write_cache_file(path.with_suffix(".json"), json.dumps(metadata).encode("utf-8"))
+    except OSError as error:
+        print("Unable to refresh cached response", url, repr(error))
+    return metadata
+
+
+def write_cache_file(path: Path, content: bytes):
+    """
+    Replaces a cache file without exposing a partially written file.
+
+    Parameters
+    ----------
+    path: Path
+        Path of the cache file
+    content: bytes
+        New content of the file
+    """
+    # write to a temporary file first so concurrent readers never see partial entries
+    temporary_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(content)
+    os.replace(temporary_path, path)
+
+
+def prune_cache(max_age: float = CACHE_MAX_AGE, max_size: int = CACHE_MAX_SIZE) -> dict:
+    """
+    Removes cache entries that are too old, then the oldest entries until the cache
+    fits its size bound.
+
+    The age of an entry is the time since it was last stored or revalidated. Temporary
+    files left by an interrupted write are removed once they are too old.
+
+    Parameters
+    ----------
+    max_age: float
+        Longest time in seconds an entry is kept
+    max_size: int
+        Largest total size in bytes of the kept entries
+
+    Returns
+    -------
+    dict
+        Dictionary containing the number and size of the removed and kept entries
+    """
+    entries = {}
+    for path in CACHE_DIRECTORY.glob("*/*"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        # the body and metadata files of a url share a name without suffix
+        entry = entries.setdefault(path.with_suffix(""), {"paths": [], "size": 0, "time": 0})
+        entry["paths"].append(path)
+        entry["size"] += stat.st_size
+        entry["time"] = max(entry["time"], stat.st_mtime)
+
+    now = time.time()
+    stats = {"removed": 0, "removed_bytes": 0, "kept": 0, "kept_bytes": 0}
+    for entry in sorted(entries.values(), key=lambda entry: entry["time"], reverse=True):
+        if now - entry["time"] <= max_age and stats["kept_bytes"] + entry["size"] <= max_size:
+            stats["kept"] += 1
+            stats["kept_bytes"] += entry["size"]
+            continue
+        # remove the metadata first so a reader never revalidates a missing body
+        for path in sorted(entry["paths"], key=lambda path: path.suffix != ".json"):
+            path.unlink(missing_ok=True)
+        stats["removed"] += 1
+        stats["removed_bytes"] += entry["size"]
+    if stats["removed"]:
+        print(
+            "Pruned", stats["removed"], "cached responses,",
+            f"{stats['removed_bytes'] / 1e6:.2f} MB, kept {stats['kept_bytes'] / 1e6:.2f} MB",
+        )
+    return stats
+
+
+def prune_cache_if_due():
+    """
+    Prunes the cache if CACHE_PRUNE_INTERVAL has passed since the last prune.
+    """
+    global CACHE_PRUNE_TIME  # pylint: disable=global-statement
+    # a prune already running in another thread covers this one
+    if not CACHE_PRUNE_LOCK.acquire(blocking=False):
+        return
+    try:
+        if time.time() - CACHE_PRUNE_TIME < CACHE_PRUNE_INTERVAL:
+            return
+        CACHE_PRUNE_TIME = time.time()
+        prune_cache()
+    finally:
+        CACHE_PRUNE_LOCK.release()
+
+
+def build_cached_response(url: str, metadata: dict, body: bytes) -> requests.Response:
+    """
+    Rebuilds a response object from cached metadata and body.
+
+    Parameters
+    ----------
+    url: str
+        String containing url of the cached response
+    metadata: dict
+        Dictionary of cached validators and headers
+    body: bytes
+        Cached response body
+
+    Returns
+    -------
+    response: requests.Response
+        Response with a 200 status code and the cached body
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = HTTP_SUCCESS
+    response.headers = CaseInsensitiveDict(metadata.get("headers", {}))
+    response.encoding = metadata.get("encoding")
+    response._content = body  # pylint: disable=protected-access
+    return response
+
+
+def get_cache_path(url: str) -> Path:
+    """
+    Return the cache path prefix for a given url.
+
+    Parameters
+    ----------
+    url: str
+        String containing url
+
+    Returns
+    -------
+    Path
+        Concrete path without suffix for the url's cache entry
+    """
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return CACHE_DIRECTORY.joinpath(digest[:2], digest)
+
+
+def record_cache_result(source: str, hit: bool):
+    """
+    Increments the cache hit or miss count for a given source.
+
+    Parameters
+    ----------
+    source: str
+        Name of the site the request belongs to
+    hit: bool
+        True if the response was served from the cache
+    """
+    with CACHE_STATS_LOCK:
+        stats = CACHE_STATS.setdefault(source, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+
+def report_cache_stats(source: str) -> dict:
+    """
+    Prints and resets the cache hit and miss counts for a given source.
+
+    Parameters
+    ----------
+    source: str
+        Name of the site to report on
+
+    Returns
+    -------
+    stats: dict
+        Dictionary containing the hit and miss counts since the last report
+    """
+    with CACHE_STATS_LOCK:
+        stats = CACHE_STATS.pop(source, {"hits": 0, "misses": 0})
+    print(f"{source} cache: {stats['hits']} hits, {stats['misses']} misses")
+    return stats
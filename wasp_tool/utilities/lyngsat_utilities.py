@@ -2,7 +2,7 @@
 This module pulls satellite channel information and channel status from lyngsat.com
 
 FUNCTIONS
-    def prepare_lyngsat() -> Tuple[dict, dict]:
+    def prepare_lyngsat(max_per_host: int, max_workers: int) -> Tuple[dict, dict]:
         Generates a dictionary containing all satellites primary and secondary names pulled
         from LyngSat.
         Generates a dictionary of processed and refactored tables containing channel
@@ -17,8 +17,18 @@ FUNCTIONS
         Remove extraneous hrefs from a dict of satellite hrefs.
     def get_satellite_names(satellite_urls_dict: dict) -> dict:
         Generates dictionary containing primary and secondary names for each satellite.
-    def get_satellite_html_tables(satellite_url_dict: dict, satellite_names_dict: dict) -> dict:
-        Generates a dictionary of all html tables for each satellite.
+    def get_satellite_channel_tables(
+        page_urls_dict: dict, max_per_host: int, max_workers: int, checkpoint: dict
+    ) -> dict:
+        Generates a dictionary containing one master channels table for each satellite.
+    def parse_satellite_channel_page(
+        content: bytes, key: str, recorded_fingerprint: str
+    ) -> Tuple[str, pd.DataFrame]:
+        Parses a satellite page into its master channels table.
+    def get_channel_tables(content: bytes) -> list:
+        Parses a satellite page and returns its channel tables.
+    def find_channel_tables(soup: BeautifulSoup) -> list:
+        Find all channel tables within parsed html text.
     def convert_html_tables_to_dataframes(html_tables: dict) -> dict:
         Convert parsed html tables into pandas dataframes.
     def read_multirow_table_into_standard_format(
@@ -27,37 +37,38 @@ FUNCTIONS
         Reads in and converts a html text table into a pandas dataframe format.
     def replace_breaks_with_newlines(table: str) -> str:
         Replace breaks in html text with newline characters.
+    def get_channel_status(row_cells: list) -> str:
+        Determine the channel status of a table row from its provider/channel name cell.
     def get_row_spans(cell: str) -> int:
         Determine the multi-row span for a given table cell.
     def denote_italicized_table_entries_with_asterik(
-        table_df: pd.DataFrame,
+        table_grid: list,
+        occupied: list,
         table_cell: str,
         index: int,
         column_index: int,
         column_width: int,
         rows_per_cell: int,
-    ) -> pd.DataFrame:
+    ):
         Denotes italicized entries in html text by adding an '*' to string text.
     def clean_all_dataframes(satellite_df_tables_dict: dict) -> dict:
         Resize multirow entries to new columns and clean all pd.DataFrame type tables.
     def split_frequency_beam_and_eirp_values(
-        df_subset: pd.DataFrame, df_new: pd.DataFrame
+        df_clean: pd.DataFrame, df_new: pd.DataFrame
         ) -> pd.DataFrame:
         Split multi-row frequency/beam/eirp values into separate dataframe columns.
     def split_system_sr_and_fec_values(
-        df_subset: pd.DataFrame, df_new: pd.DataFrame
+        df_clean: pd.DataFrame, df_new: pd.DataFrame
     ) -> pd.DataFrame:
         Split multi-row system/fr/fec values into separate dataframe columns.
     def edit_provider_name_and_channel_name_values(
-        df_subset: pd.DataFrame, df_new: pd.DataFrame
+        df_clean: pd.DataFrame, df_new: pd.DataFrame
     ) -> pd.DataFrame:
         Refactor provider name/channel name values into new format.
-    def determine_channel_status(
-        satellite_html_tables_dict: dict, satellite_df_tables_clean_dict: dict
-    ) -> dict:
-        Determine channel status and add new column to cleaned df tables.
-    def remove_empty_tables(html_tables: list, df_tables: list) -> Tuple[list, list]:
-        Remove empty tables from lists.
+    def determine_channel_status(satellite_df_tables_clean_dict: dict) -> dict:
+        Combine the cleaned df tables of each satellite into one master channels table.
+    def remove_empty_tables(df_tables: list) -> list:
+        Remove empty tables from a list.
     def clean_provider_channel_name_rows(table: pd.DataFrame) -> pd.DataFrame:
         Remove extraneous values from the (Provider) Channel Name column.
     def create_bands_column(df_org: pd.DataFrame) -> pd.DataFrame:
@@ -67,10 +78,12 @@ FUNCTIONS
 import sys
 from typing import Tuple
 
+import lxml.etree
+import lxml.html
 import numpy as np
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector
 
 from wasp_tool import utilities
 
@@ -84,11 +97,26 @@ REGIONS = ["Asia", "Europe", "Atlantic", "America"]
 # define http response success
 HTTP_SUCCESS = 200
 
+# define text found in every channel table
+CHANNEL_TABLE_STRING_CHECK = "https://www.lyngsat.com/"
+
 # define number of table columns for each satellite page
 NUM_COLS = 10
 
+# define checkpoint key of the satellite urls, satellite entries are keyed by page url
+SATELLITE_URLS_CHECKPOINT_KEY = "satellite_urls"
 
-def prepare_lyngsat() -> Tuple[dict, dict]:
+# define channel name cell styles of channels that are on (green and yellow)
+CHANNEL_ON_STYLES = ["background:#bbffbb", "background:#ffffbb"]
+
+# define version of the channel table parsing and cleaning, part of every fingerprint so
+# recorded tables are parsed again after a change, bump whenever that logic changes
+PARSER_VERSION = 1
+
+
+def prepare_lyngsat(
+    max_per_host: int = utilities.MAX_REQUESTS_PER_HOST, max_workers: int = None
+) -> Tuple[dict, dict]:
     """
     Generates a dictionary containing all satellites primary and secondary names pulled
     from LyngSat.
@@ -96,6 +124,16 @@ def prepare_lyngsat() -> Tuple[dict, dict]:
     Generates a dictionary of processed and refactored tables containing channel
     information and status for each satellite.
 
+    Progress is checkpointed per satellite as each page is parsed, so a run that dies
+    partway through the crawl resumes with the satellites it had not completed.
+
+    Parameters
+    ----------
+    max_per_host: int
+        Maximum number of simultaneous requests sent to lyngsat.com
+    max_workers: int
+        Number of processes parsing satellite pages, None uses every core
+
     Returns
     -------
     Tuple[dict, dict]
@@ -106,27 +144,30 @@ def prepare_lyngsat() -> Tuple[dict, dict]:
     satellite_df_tables_final_dict: dict
         Dictionary containing process and refactored channel table for each satellite.
     """
-    # get region urls
-    region_urls = get_region_urls()
-    # get all satellite urls
-    satellite_urls_dict = get_satellite_urls(region_urls)
+    # resume an unfinished run from its checkpoint
+    checkpoint = utilities.load_checkpoint("lyngsat")
+    if SATELLITE_URLS_CHECKPOINT_KEY in checkpoint:
+        satellite_urls_dict = checkpoint[SATELLITE_URLS_CHECKPOINT_KEY]
+    else:
+        # get region urls
+        region_urls = get_region_urls()
+        # get all satellite urls
+        satellite_urls_dict = get_satellite_urls(region_urls)
+        utilities.save_checkpoint_entry(
+            "lyngsat", SATELLITE_URLS_CHECKPOINT_KEY, satellite_urls_dict
+        )
     # get primary and secondary satellite names in dict
     satellite_names_dict = get_satellite_names(satellite_urls_dict)
-    # get dict of all html tables for all satellites
-    satellite_html_tables_dict = get_satellite_html_tables(
-        satellite_urls_dict, satellite_names_dict
+    # key the fingerprint store by each satellite's page url
+    satellite_page_urls_dict = dict(
+        zip(satellite_names_dict["Primary Satellite Name"], satellite_urls_dict.values())
     )
-    # convert the html tables to pd dataframes
-    satellite_df_tables_dict = convert_html_tables_to_dataframes(
-        satellite_html_tables_dict
-    )
-    # clean each df table
-    satellite_df_tables_clean_dict = clean_all_dataframes(
-        satellite_df_tables_dict)
-    # determine channel status for each channel in all tables
-    satellite_df_tables_final_dict = determine_channel_status(
-        satellite_html_tables_dict, satellite_df_tables_clean_dict
+    # fetch and parse each satellite page into one master channels table
+    satellite_df_tables_final_dict = get_satellite_channel_tables(
+        satellite_page_urls_dict, max_per_host, max_workers, checkpoint
     )
+    # the run is complete, the next one starts from scratch
+    utilities.clear_checkpoint("lyngsat")
     return satellite_names_dict, satellite_df_tables_final_dict
 
 
@@ -139,8 +180,8 @@ def get_region_urls() -> list:
     region_urls: list
         List containing corresponding url for each region
     """
-    http_response = requests.get(LYNGSAT_HOMEPAGE)
-    if http_response.status_code == HTTP_SUCCESS:
+    http_response = utilities.fetch(LYNGSAT_HOMEPAGE, "lyngsat")
+    if http_response is not None and http_response.status_code == HTTP_SUCCESS:
         soup = BeautifulSoup(http_response.text, "lxml")
         region_urls = []
         for region in REGIONS:
@@ -164,11 +205,9 @@ def get_satellite_urls(region_urls: list) -> dict:
     """
     satellite_url_dict = {}
     for region in region_urls:
-        response = requests.get(
-            region, allow_redirects=False
-        )  # Heroku has specified timeout
+        response = utilities.fetch(region, "lyngsat", allow_redirects=False)
         # Check if the status_code is 200
-        if response.status_code == HTTP_SUCCESS:
+        if response is not None and response.status_code == HTTP_SUCCESS:
             # Parse the HTML content of the webpage
             soup = BeautifulSoup(response.content, "lxml")
             # Find hrefs
@@ -268,58 +307,201 @@ def get_satellite_names(satellite_urls_dict: dict) -> dict:
     return satellite_names_dict
 
 
-def get_satellite_html_tables(
-    satellite_url_dict: dict, satellite_names_dict: dict
+def get_satellite_channel_tables(
+    page_urls_dict: dict,
+    max_per_host: int = utilities.MAX_REQUESTS_PER_HOST,
+    max_workers: int = None,
+    checkpoint: dict = None,
 ) -> dict:
     """
-    Generates a dictionary of all html tables for each satellite.
+    Generates a dictionary containing one master channels table for each satellite.
+
+    Satellite pages are fetched concurrently and handed to parse worker processes as
+    they complete. Pages whose channel tables are unchanged since the last run reuse
+    the recorded table instead of being converted again. Each satellite is recorded in
+    the "lyngsat" checkpoint as soon as its worker completes, while the crawl is still
+    running, and satellites already in the checkpoint are not fetched again.
 
     Parameters
     ----------
-    satellite_url_dict: dict
-        Dictionary containing satellite names and corresponding urls
-
-    satellite_names_dict: dict
-        Dictionary containing all primary and secondary satellite names
+    page_urls_dict: dict
+        Dictionary containing the page url for each satellite's primary name
+    max_per_host: int
+        Maximum number of simultaneous requests sent to lyngsat.com
+    max_workers: int
+        Number of processes parsing satellite pages, None uses every core
+    checkpoint: dict
+        Dictionary containing the entries recorded by an unfinished run, keyed by page url
 
     Returns
     -------
-    html_tables_dict: dict
-        Dictionary containing all html tables for each satellite
+    df_tables_dict: dict
+        Dictionary containing one master channels table per satellite, satellites
+        without a channel table are left out
         key: satellite's primary name
-        value: list of html tables
+        value: pd.DataFrame
+    """
+    # satellites completed by an unfinished run are not fetched again
+    checkpoint = checkpoint or {}
+    df_tables_dict = {
+        key: checkpoint[url] for key, url in page_urls_dict.items() if url in checkpoint
+    }
+    if df_tables_dict:
+        print("Resuming from checkpoint with", len(df_tables_dict), "satellites completed")
+    remaining_urls_dict = {
+        key: url for key, url in page_urls_dict.items() if key not in df_tables_dict
+    }
+
+    # the fingerprint store is keyed by each satellite's page url
+    recorded_dict = {
+        key: utilities.load_fingerprint("lyngsat", url)
+        for key, url in remaining_urls_dict.items()
+    }
+    arguments = {key: (key, recorded_dict[key][0]) for key in remaining_urls_dict}
+    pages = utilities.crawl(remaining_urls_dict, "lyngsat", max_per_host)
+
+    num_resumed = len(df_tables_dict)
+    num_unchanged = 0
+    for key, record in utilities.parse_pages(
+        pages, parse_satellite_channel_page, max_workers, arguments
+    ):
+        if record is None:
+            continue
+        fingerprint, table = record
+        recorded_fingerprint, recorded_table = recorded_dict[key]
+        if fingerprint == recorded_fingerprint:
+            table = recorded_table
+            num_unchanged += 1
+        else:
+            utilities.save_fingerprint("lyngsat", page_urls_dict[key], fingerprint, table)
+        utilities.save_checkpoint_entry("lyngsat", page_urls_dict[key], table)
+        df_tables_dict[key] = table
+    print(
+        "Reused", num_unchanged, "unchanged and parsed",
+        len(df_tables_dict) - num_resumed - num_unchanged, "changed satellite pages"
+    )
+    # keep the satellite order, dropping satellites without a channel table
+    return {
+        key: df_tables_dict[key]
+        for key in page_urls_dict
+        if df_tables_dict.get(key) is not None
+    }
+
+
+def parse_satellite_channel_page(
+    content: bytes, key: str, recorded_fingerprint: str
+) -> Tuple[str, pd.DataFrame]:
+    """
+    Parses a satellite page into its master channels table.
+
+    Runs in a parse worker process, so only the fingerprint and the final table are
+    returned, never the html tables.
+
+    Parameters
+    ----------
+    content: bytes
+        Html content of a satellite page
+    key: str
+        Satellite's primary name
+    recorded_fingerprint: str
+        Fingerprint of the page's channel tables recorded by the last run, None if
+        the page has not been parsed before
+
+    Returns
+    -------
+    Tuple[str, pd.DataFrame]
+
+    fingerprint: str
+        Fingerprint of the page's html channel tables and PARSER_VERSION
+    table: pd.DataFrame
+        Master channels table, None if the page has no channel table or its
+        fingerprint matches recorded_fingerprint
+    """
+    html_tables = get_channel_tables(content)
+    fingerprint = utilities.compute_fingerprint([PARSER_VERSION, *html_tables])
+    if fingerprint == recorded_fingerprint:
+        return fingerprint, None
+    # convert the html tables to pd dataframes, reading channel status in the same pass
+    satellite_df_tables_dict = convert_html_tables_to_dataframes({key: html_tables})
+    # clean each df table
+    satellite_df_tables_clean_dict = clean_all_dataframes(satellite_df_tables_dict)
+    # combine the channel tables of the satellite
+    satellite_df_tables_new_dict = determine_channel_status(satellite_df_tables_clean_dict)
+    return fingerprint, satellite_df_tables_new_dict.get(key)
+
+
+def get_channel_tables(content: bytes) -> list:
+    """
+    Parses a satellite page and returns its channel tables.
+
+    The channel tables are located with an XPath query on a fast lxml tree and only
+    those tables are parsed into BeautifulSoup objects. Falls back to searching a full
+    parse of the page when no table matches.
+
+    Parameters
+    ----------
+    content: bytes
+        Html content of a satellite page
+
+    Returns
+    -------
+    html_tables: list
+        List of html channel tables
+    """
+    # decode with the encoding BeautifulSoup would try first so both paths see the same text
+    encoding = next(EncodingDetector(content, is_html=True).encodings, None)
+    html_tables = []
+    try:
+        tree = lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=encoding))
+    except (lxml.etree.ParserError, LookupError, ValueError):
+        tree = None
+    if tree is not None:
+        # smart search for table of interest, no class or tags to search by
+        candidates = tree.xpath(
+            "//table[not(@class)][contains(string(.), $string_check)]",
+            string_check=CHANNEL_TABLE_STRING_CHECK,
+        )
+        # serialize outermost candidates only; nested ones are found again below
+        candidate_set = set(candidates)
+        outermost = [
+            table
+            for table in candidates
+            if not any(ancestor in candidate_set for ancestor in table.iterancestors("table"))
+        ]
+        if outermost:
+            fragment = "".join(
+                lxml.html.tostring(table, encoding="unicode") for table in outermost
+            )
+            html_tables = find_channel_tables(BeautifulSoup(fragment, "lxml"))
+    if not html_tables:
+        # page layout did not match, search the full page
+        html_tables = find_channel_tables(BeautifulSoup(content, "lxml"))
+    return html_tables
+
+
+def find_channel_tables(soup: BeautifulSoup) -> list:
     """
-    html_tables_dict = {}
-    satellite_primary_names = satellite_names_dict["Primary Satellite Name"]
-    count = 0
-    for key, value in satellite_url_dict.items():
-        # Define max attempts for each requests.get
-        maximum_attempts = 10
-        for i in range(maximum_attempts):
-            try:
-                # Heroku has specified timeout
-                http_response = requests.get(value)
-                # Check if the status_code is 200
-                if http_response.status_code == 200:
-                    # Parse the HTML content of the webpage
-                    soup = BeautifulSoup(http_response.content, "lxml")
-                    html_tables = []
-                    for table in soup.find_all("table"):
-                        text = table.text
-                        # smart search for table of interest, no class or tags to search by
-                        string_check = "https://www.lyngsat.com/"
-                        if string_check in text:
-                            # only the bigtable has a class
-                            if not table.has_attr("class"):
-                                html_tables.append(table)
-                    entry = satellite_primary_names[count]
-                    html_tables_dict[entry] = html_tables
-                    print("Attempt", i + 1, "successful for", key)
-                    break
-            except:
-                print("Attempt", i + 1, "unsuccessful for", key)
-        count += 1
-    return html_tables_dict
+    Find all channel tables within parsed html text.
+
+    Parameters
+    ----------
+    soup: BeautifulSoup
+        BeautifulSoup object containing parsed html text
+
+    Returns
+    -------
+    html_tables: list
+        List of html channel tables
+    """
+    html_tables = []
+    for table in soup.find_all("table"):
+        text = table.text
+        # smart search for table of interest, no class or tags to search by
+        if CHANNEL_TABLE_STRING_CHECK in text:
+            # only the bigtable has a class
+            if not table.has_attr("class"):
+                html_tables.append(table)
+    return html_tables
 
 
 def convert_html_tables_to_dataframes(html_tables: dict) -> dict:
@@ -385,6 +567,12 @@ def read_multirow_table_into_standard_format(
     """
     Reads in and converts a html text table into a pandas dataframe format.
 
+    Cells are placed on a plain list grid, with an occupancy bitmap tracking the slots
+    already filled by multi-row cells, and the grid is converted to a dataframe once.
+
+    The channel status of each row is read from the style of its provider/channel name
+    cell in the same pass and attached as the "Channel Status" column.
+
     Parameters
     ----------
     tables_rows: str
@@ -395,40 +583,76 @@ def read_multirow_table_into_standard_format(
     Returns
     -------
     df: pd.DataFrame
-        Dataframe respresentation of the original html text table
+        Dataframe respresentation of the original html text table with an added
+        "Channel Status" column
 
     """
-    # instantialize empty df of size num_rows x NUM_COLS
-    df = pd.DataFrame(np.ones((num_rows, NUM_COLS)) * np.nan)
+    # instantialize empty grid of size num_rows x NUM_COLS
+    table_grid = [[np.nan] * NUM_COLS for _ in range(num_rows)]
+    occupied = [bytearray(NUM_COLS) for _ in range(num_rows)]
+    channel_statuses = []
 
     column_width = 1
+    column_index = 0
     # handle multi-row columns
     for index, row in enumerate(table_rows):
-        try:
-            column_index = df.iloc[index,
-                                   :][df.iloc[index, :].isnull()].index[0]
-        except IndexError:
+        # start at the first slot not filled by a cell from a previous row
+        first_free_column = occupied[index].find(0)
+        if first_free_column == -1:
             print(index, row)
+        else:
+            column_index = first_free_column
 
-        for cell in row.find_all(["td", "th"]):
+        row_cells = row.find_all(["td", "th"])
+        channel_statuses.append(get_channel_status(row_cells))
+        for cell in row_cells:
             rows_per_cell = get_row_spans(cell)
             # find first non-na col and fill that one
-            while any(
-                df.iloc[index, column_index: column_index +
-                        rows_per_cell].notnull()
-            ):
+            while any(occupied[index][column_index: column_index + rows_per_cell]):
                 column_index += 1
 
-            df = denote_italicized_table_entries_with_asterik(
-                df, cell, index, column_index, column_width, rows_per_cell
+            denote_italicized_table_entries_with_asterik(
+                table_grid, occupied, cell, index, column_index, column_width, rows_per_cell
             )
 
-            if column_index < df.shape[1] - 1:
+            if column_index < NUM_COLS - 1:
                 column_index += column_width
 
+    df = pd.DataFrame(table_grid)
+    df["Channel Status"] = channel_statuses
     return df
 
 
+def get_channel_status(row_cells: list) -> str:
+    """
+    Determine the channel status of a table row from its provider/channel name cell.
+
+    Parameters
+    ----------
+    row_cells: list
+        List of td/th cells in the table row
+
+    Returns
+    -------
+    str
+        "ON" if the provider/channel name cell is green or yellow
+        "OFF" otherwise
+    """
+    data_cells = [cell for cell in row_cells if cell.name == "td"]
+    # cond for multirow
+    if len(data_cells) == 8:
+        channel_cell = data_cells[1]
+    # cond for singular row
+    elif len(data_cells) == 10:
+        channel_cell = data_cells[3]
+    # header/footer condition
+    else:
+        return "OFF"
+    if channel_cell.get("style") in CHANNEL_ON_STYLES:
+        return "ON"
+    return "OFF"
+
+
 def get_row_spans(cell: str) -> int:
     """
     Determine the multi-row span for a given table cell.
@@ -451,20 +675,23 @@ def get_row_spans(cell: str) -> int:
 
 
 def denote_italicized_table_entries_with_asterik(
-    table_df: pd.DataFrame,
+    table_grid: list,
+    occupied: list,
     table_cell: str,
     index: int,
     column_index: int,
     column_width: int,
     rows_per_cell: int,
-) -> pd.DataFrame:
+):
     """
     Denotes italicized entries in html text by adding an '*' to string text.
 
     Parameters
     ----------
-    table_df: pd.DataFrame
-        Dataframe to populate with entries
+    table_grid: list
+        List of row lists to populate with entries
+    occupied: list
+        List of bytearrays marking the filled slots of each row
     table_cell: str
         String containing table cell
     index: int
@@ -475,29 +702,21 @@ def denote_italicized_table_entries_with_asterik(
         Number of columns in a table
     rows_per_cell: int
         Number of rows per cell in a table
-    Returns
-    -------
-    table_df: pd.DataFrame
-        Populated dataframe
-    """
-    # check if <i> is a child of cell
-    children = table_cell.findChildren()
-    for child in children:
-        # add asterik to signal text was originally in italics; this is key
-        # for separating the provider/channel column
-        if child.find("i"):
-            table_df.iloc[
-                index: index + rows_per_cell,
-                column_index: column_index + column_width,
-            ] = (
-                table_cell.getText() + "*"
-            )
-            break
-        table_df.iloc[
-            index: index + rows_per_cell,
-            column_index: column_index + column_width,
-        ] = table_cell.getText()
-    return table_df
+    """
+    # cells without child elements are left empty
+    if table_cell.find() is None:
+        return
+    text = table_cell.getText()
+    # add asterik to signal text was originally in italics; this is key
+    # for separating the provider/channel column
+    if any(italic.parent is not table_cell for italic in table_cell.find_all("i")):
+        text += "*"
+    last_row = min(index + rows_per_cell, len(table_grid))
+    last_column = min(column_index + column_width, NUM_COLS)
+    for row in range(index, last_row):
+        for column in range(column_index, last_column):
+            table_grid[row][column] = text
+            occupied[row][column] = 1
 
 
 def clean_all_dataframes(satellite_df_tables_dict: dict) -> dict:
@@ -523,7 +742,7 @@ def clean_all_dataframes(satellite_df_tables_dict: dict) -> dict:
     for key, list_of_dataframes in satellite_df_tables_dict.items():
         list_of_dataframes_clean = []
         for df_table in list_of_dataframes:
-            # drop all columns except 0, 1, and 3 corresponding to
+            # drop all columns except 0, 1, 3 and the channel status corresponding to
             # (0) Frequency Beam EIRP (dBW)
             # (1) System SR FEC
             # (3) Provider Name Channel Name
@@ -532,7 +751,7 @@ def clean_all_dataframes(satellite_df_tables_dict: dict) -> dict:
             df_table = df_table.astype(str)
 
             # create new df with desired column subset
-            df_clean = df_table.iloc[:, [0, 1, 3]]
+            df_clean = df_table[[0, 1, 3, "Channel Status"]]
             # drop header and footer rows
             df_clean.drop(
                 index=[df_clean.index[0], df_clean.index[1]], axis=0, inplace=True
@@ -557,17 +776,12 @@ def clean_all_dataframes(satellite_df_tables_dict: dict) -> dict:
                 ],
             )
 
-            # iterate through rows with same info for col 0 (i.e. identify multirow boundaries)
-            rows = df_clean[0].unique()
-
-            for val in rows:
-                df_subset = df_clean.loc[df_clean[0].isin([val])]
-                # split multirow values into individual columns
-                df_new = split_frequency_beam_and_eirp_values(
-                    df_subset, df_new)
-                df_new = split_system_sr_and_fec_values(df_subset, df_new)
-                df_new = edit_provider_name_and_channel_name_values(
-                    df_subset, df_new)
+            df_new["Channel Status"] = df_clean["Channel Status"].to_numpy()
+            # rows with same info for col 0 form one multirow entry; split the
+            # multirow values of all entries into individual columns at once
+            df_new = split_frequency_beam_and_eirp_values(df_clean, df_new)
+            df_new = split_system_sr_and_fec_values(df_clean, df_new)
+            df_new = edit_provider_name_and_channel_name_values(df_clean, df_new)
 
             list_of_dataframes_clean.append(df_new)
         satellite_df_tables_dict_clean[key] = list_of_dataframes_clean
@@ -575,15 +789,19 @@ def clean_all_dataframes(satellite_df_tables_dict: dict) -> dict:
 
 
 def split_frequency_beam_and_eirp_values(
-    df_subset: pd.DataFrame, df_new: pd.DataFrame
+    df_clean: pd.DataFrame, df_new: pd.DataFrame
 ) -> pd.DataFrame:
     """
     Split multi-row frequency/beam/eirp values into separate dataframe columns.
 
+    Each distinct column 0 value is split once and the parts are mapped back onto
+    every row of its multi-row entry. When several parts match the same column the
+    last one wins.
+
     Parameters
     ----------
-    df_subset: pd.DataFrame
-        Dataframe containing a single multi-row entry to separate
+    df_clean: pd.DataFrame
+        Dataframe containing the multi-row entries to separate
     df_new: pd.DataFrame
         Dataframe to be populated by function operations
 
@@ -593,34 +811,42 @@ def split_frequency_beam_and_eirp_values(
         Dataframe with now populated entries
     """
     # split column 0
-    col0_value = str(df_subset.iloc[0, 0])
-    split0_value = col0_value.split("\n")
-    for split in split0_value:
-        if "tp" in split:
-            df_new.loc[df_subset.index, "Transponder"] = split
-            continue
-        if any(s.isdigit() for s in split) is False:
-            df_new.loc[df_subset.index, "Beam"] = split
-            continue
-        if ("L" in split) or ("R" in split) or ("H" in split) or ("V" in split):
-            df_new.loc[df_subset.index, "Frequency"] = split
-            continue
-        if "*" in split:
-            split = split.replace("*", "")
-            df_new.loc[df_subset.index, "EIRP (dBW)"] = split
+    values = pd.Series(df_clean[0].unique(), dtype=object)
+    splits = values.str.split("\n").explode()
+    has_digit = splits.map(lambda split: any(s.isdigit() for s in split))
+    columns = np.select(
+        [
+            splits.str.contains("tp", regex=False),
+            ~has_digit.astype(bool),
+            splits.str.contains("[LRHV]"),
+            splits.str.contains("*", regex=False),
+        ],
+        ["Transponder", "Beam", "Frequency", "EIRP (dBW)"],
+        default="",
+    )
+    splits = splits.where(columns != "EIRP (dBW)", splits.str.replace("*", "", regex=False))
+    parts = pd.DataFrame({"value": values[splits.index].to_numpy(), "column": columns,
+                          "split": splits.to_numpy()})
+    parts = parts[parts["column"] != ""]
+    parsed = parts.groupby(["value", "column"], sort=False)["split"].last().unstack()
+    for column in parsed.columns:
+        df_new[column] = parsed[column].reindex(df_clean[0]).to_numpy()
     return df_new
 
 
 def split_system_sr_and_fec_values(
-    df_subset: pd.DataFrame, df_new: pd.DataFrame
+    df_clean: pd.DataFrame, df_new: pd.DataFrame
 ) -> pd.DataFrame:
     """
     Split multi-row system/fr/fec values into separate dataframe columns.
 
+    The column 1 value of the first row of each multi-row entry is split once. FEC and
+    SR take the last matching part, the remaining parts are joined into System.
+
     Parameters
     ----------
-    df_subset: pd.DataFrame
-        Dataframe containing a single multi-row entry to separate
+    df_clean: pd.DataFrame
+        Dataframe containing the multi-row entries to separate
     df_new: pd.DataFrame
         Dataframe to be populated by function operations
 
@@ -630,36 +856,39 @@ def split_system_sr_and_fec_values(
         Dataframe with now populated entries
     """
     # split column 1
-    col1_value = str(df_subset.iloc[0, 1])
-    split1_value = col1_value.split("\n")
-    for split in split1_value:
-        if "/" in split:
-            df_new.loc[df_subset.index, "FEC"] = split
-            continue
-        elif all(s.isdigit() for s in split):
-            df_new.loc[df_subset.index, "SR"] = split
-            continue
-        else:
-            if df_new.loc[df_subset.index, "System"].isnull().values.all():
-                df_new.loc[df_subset.index, "System"] = split
-            else:
-                df_new.loc[df_subset.index, "System"] = (
-                    df_new.loc[df_subset.index, "System"].astype(
-                        str) + " " + split
-                )
+    # the grouped index is named 0, drop the name so level 0 is not read as a label
+    first_values = df_clean.groupby(0, sort=False)[1].first().rename_axis(None)
+    splits = first_values.str.split("\n").explode()
+    is_fec = splits.str.contains("/", regex=False)
+    is_sr = ~is_fec & splits.map(lambda split: all(s.isdigit() for s in split)).astype(bool)
+    parsed = pd.DataFrame(
+        {
+            "FEC": splits[is_fec].groupby(level=0, sort=False).last(),
+            "SR": splits[is_sr].groupby(level=0, sort=False).last(),
+            "System": splits[~is_fec & ~is_sr].groupby(level=0, sort=False).agg(" ".join),
+        },
+        dtype=object,
+    )
+    for column in parsed.columns:
+        if parsed[column].notnull().any():
+            df_new[column] = parsed[column].reindex(df_clean[0]).to_numpy()
     return df_new
 
 
 def edit_provider_name_and_channel_name_values(
-    df_subset: pd.DataFrame, df_new: pd.DataFrame
+    df_clean: pd.DataFrame, df_new: pd.DataFrame
 ) -> pd.DataFrame:
     """
     Refactor provider name/channel name values into new format.
 
+    Within a multi-row entry, the last italicized (provider) row and every row before
+    it become "(provider)", later rows become "(provider) channel" and entries without
+    a provider keep their channel names.
+
     Parameters
     ----------
-    df_subset: pd.DataFrame
-        Dataframe containing a single multi-row entry to separate
+    df_clean: pd.DataFrame
+        Dataframe containing the multi-row entries to separate
     df_new: pd.DataFrame
         Dataframe to be populated by function operations
 
@@ -669,37 +898,38 @@ def edit_provider_name_and_channel_name_values(
         Dataframe with now populated entries
     """
     # split column 2
-    new_string = ""
-    for i in range(0, len(df_subset)):
-        test_string = str(df_subset.iloc[i, 2])
-        if "*" in test_string:
-            new_string = test_string.replace("*", "")
-            df_new.loc[df_subset.index, "(Provider) Channel Name"] = (
-                "(" + new_string + ")"
-            )
-        else:
-            if new_string == "":
-                df_new.loc[df_subset.index[i],
-                           "(Provider) Channel Name"] = test_string
-            else:
-                df_new.loc[df_subset.index[i], "(Provider) Channel Name"] = (
-                    "(" + new_string + ") " + test_string
-                )
+    if df_clean.empty:
+        return df_new
+    names = df_clean[3]
+    entries = df_clean[0]
+    is_provider = names.str.contains("*", regex=False)
+    position = df_clean.groupby(0, sort=False).cumcount()
+    provider_position = position.where(is_provider).groupby(entries).transform("max")
+    provider_name = (
+        names.str.replace("*", "", regex=False).where(is_provider).groupby(entries).transform("last")
+    )
+    provider = "(" + provider_name + ")"
+    df_new["(Provider) Channel Name"] = np.where(
+        provider_position.isnull(),
+        names,
+        np.where(
+            position <= provider_position,
+            provider,
+            np.where(provider_name == "", names, provider + " " + names),
+        ),
+    )
     return df_new
 
 
-def determine_channel_status(
-    satellite_html_tables_dict: dict, satellite_df_tables_clean_dict: dict
-) -> dict:
+def determine_channel_status(satellite_df_tables_clean_dict: dict) -> dict:
     """
-    Determine channel status and add new column to cleaned df tables.
+    Combine the cleaned df tables of each satellite into one master channels table.
+
+    The channel status of each row is read while the html table is converted, so the
+    cleaned tables already carry the "Channel Status" column.
 
     Parameters
     ----------
-    satellite_html_tables_dict: dict
-        Dictionary containing all html tables for each satellite
-        key: satellite's primary name
-        value: list of html tables
     satellite_df_tables_clean_dict: dict
         Dictionary containing all cleaned/resized pd.DataFrame tables for each satellite
         key: satellite's primary name
@@ -712,17 +942,11 @@ def determine_channel_status(
         key: satellite's primary name
         value: list of pd.DataFrame tables
     """
-    yellow = "background:#ffffbb"
-    green = "background:#bbffbb"
-
     satellite_df_tables_new_dict = {}
 
     for key, df_table_list in satellite_df_tables_clean_dict.items():
-        # note the two input dicts have matching keys
-        html_table_list = satellite_html_tables_dict[key]
         # remove empty tables
-        html_tables, df_tables = remove_empty_tables(
-            html_table_list, df_table_list)
+        df_tables = remove_empty_tables(df_table_list)
 
         # TODO: Determine why this is the only page breaking
         if "EUTELSAT 113 WEST A" in key:
@@ -730,38 +954,6 @@ def determine_channel_status(
 
         # check for empty list after removing empty tables
         if df_tables:
-            # get html for Provider Name/Channel Name column to determine channel status
-            html_columns = []
-            for html_table in html_tables:
-                col_entries = []
-                # get table rows
-                rows = html_table.find_all("tr")
-                # for each row grab column entry cell
-                for row in rows:
-                    cell = row.find_all("td")
-                    # header/footer condition
-                    if len(cell) > 1:
-                        # cond for multirow
-                        if len(cell) == 8:
-                            col_entries.append(cell[1])
-                        # cond for singular row
-                        elif len(cell) == 10:
-                            col_entries.append(cell[3])
-                # drop first entry as it is column name
-                html_columns.append(col_entries[1:])
-
-            # loop through html columns
-            for h, col in enumerate(html_columns):
-                table_star = df_tables[h]
-                # loop through channel name values in a given table
-                for m in range(0, len(table_star["(Provider) Channel Name"].values)):
-                    cell = col[m]
-                    channel_status = cell["style"]
-                    if (channel_status == green) or (channel_status == yellow):
-                        table_star.loc[m, "Channel Status"] = "ON"
-                    else:
-                        table_star.loc[m, "Channel Status"] = "OFF"
-
             # combine all tables into one large one
             master_table = pd.concat(df_tables, ignore_index=True)
             # drop excess rows
@@ -773,35 +965,21 @@ def determine_channel_status(
     return satellite_df_tables_new_dict
 
 
-def remove_empty_tables(html_tables: list, df_tables: list) -> Tuple[list, list]:
+def remove_empty_tables(df_tables: list) -> list:
     """
-    Remove empty tables from lists.
+    Remove empty tables from a list.
 
     Parameters
     ----------
-    html_tables: list
-        List of html text tables for a given satellite
     df_tables: list
         List of dataframe tables for a given satellite
 
     Returns
     -------
-    html_tables: list
-        List of html text tables for a given satellite with no empty tables
-    df_tables: list
+    list
         List of dataframe tables for a given satellite with no empty tables
     """
-    # determine empty tables to drop
-    empty_indicies = []
-    for index, table in enumerate(df_tables):
-        if table.empty:
-            empty_indicies.append(index)
-
-    for ind in empty_indicies:
-        html_tables.pop(ind)
-        df_tables.pop(ind)
-
-    return html_tables, df_tables
+    return [table for table in df_tables if not table.empty]
 
 
 def clean_provider_channel_name_rows(table: pd.DataFrame) -> pd.DataFrame:
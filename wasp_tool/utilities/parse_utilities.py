@@ -0,0 +1,250 @@
+"""
+This module defines a pipeline stage that parses fetched pages in worker processes, so
+html parsing and dataframe cleaning use every core instead of sharing one interpreter.
+
+FUNCTIONS
+    def parse_pages(
+        pages: Iterable[Tuple[str, bytes]],
+        parse_page,
+        max_workers: int,
+        arguments: dict
+    ) -> Iterator[Tuple[str, object]]:
+        Parses page contents in worker processes as they arrive and yields (key, record)
+        pairs as the workers complete.
+    def submit_pages(
+        pages: Iterable[Tuple[str, bytes]],
+        parse_page,
+        arguments: dict,
+        executor: ProcessPoolExecutor,
+        completed: queue.Queue,
+        slots: threading.Semaphore,
+        stop_event: threading.Event
+    ):
+        Submits every page to the process pool, queueing each parse once it completes.
+    def get_parse_result(key: str, future: Future) -> object:
+        Return the record of a completed parse, None if the parser failed.
+    def get_parse_executor(max_workers: int) -> ProcessPoolExecutor:
+        Creates the process pool used to parse pages.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, Tuple
+
+# define default number of parse worker processes
+MAX_PARSE_WORKERS = os.cpu_count() or 1
+
+# define number of pages queued per worker before the crawl waits for a parse to complete
+MAX_PENDING_PER_WORKER = 2
+
+# define seconds between checks for a stopped parse while every slot is taken
+SLOT_POLL_INTERVAL = 0.1
+
+# define marker queued with the number of parses once every page has been submitted
+PARSE_DONE = object()
+
+
+def parse_pages(
+    pages: Iterable[Tuple[str, bytes]],
+    parse_page,
+    max_workers: int = None,
+    arguments: dict = None,
+) -> Iterator[Tuple[str, object]]:
+    """
+    Parses page contents in worker processes as they arrive and yields (key, record)
+    pairs as the workers complete.
+
+    Pages are submitted while they are still being fetched, so parsing overlaps the
+    crawl. Pages are submitted from a separate thread, so each record is yielded as soon
+    as its worker completes, even while the crawl waits on a slow page. At most
+    MAX_PENDING_PER_WORKER pages per worker are held at once. With a single worker pages
+    are parsed in this process instead.
+
+    A page whose parser raises is reported and yielded with a None record, the same as a
+    page that could not be fetched.
+
+    Parameters
+    ----------
+    pages: Iterable[Tuple[str, bytes]]
+        (key, content) pairs, e.g. the output of crawl
+    parse_page
+        Module level function called as parse_page(content, *arguments[key]). It must
+        return a compact, picklable record (e.g. lists or dataframes, not soup objects)
+    max_workers: int
+        Number of worker processes, None uses MAX_PARSE_WORKERS
+    arguments: dict
+        Dictionary of extra positional arguments passed to parse_page
+        key: page key
+        value: tuple of arguments
+
+    Yields
+    ------
+    Tuple[str, object]
+
+    key: str
+        Identifier of the parsed page
+    record: object
+        Record returned by parse_page, None if the page content is None or the parser
+        failed
+    """
+    if max_workers is None:
+        max_workers = MAX_PARSE_WORKERS
+    if arguments is None:
+        arguments = {}
+
+    if max_workers <= 1:
+        for key, content in pages:
+            if content is None:
+                yield key, None
+                continue
+            try:
+                record = parse_page(content, *arguments.get(key, ()))
+            except Exception as error:  # pylint: disable=broad-except
+                print("Unable to parse", key, repr(error))
+                record = None
+            yield key, record
+        return
+
+    completed = queue.Queue()
+    slots = threading.Semaphore(max_workers * MAX_PENDING_PER_WORKER)
+    stop_event = threading.Event()
+    with get_parse_executor(max_workers) as executor:
+        thread = threading.Thread(
+            target=submit_pages,
+            args=(pages, parse_page, arguments, executor, completed, slots, stop_event),
+            daemon=True,
+        )
+        thread.start()
+        try:
+            num_submitted = None
+            num_parsed = 0
+            while num_submitted is None or num_parsed < num_submitted:
+                item = completed.get()
+                if isinstance(item, BaseException):
+                    raise item
+                key, future = item
+                if key is PARSE_DONE:
+                    num_submitted = future
+                elif future is None:
+                    yield key, None
+                else:
+                    num_parsed += 1
+                    slots.release()
+                    yield key, get_parse_result(key, future)
+        finally:
+            stop_event.set()
+            thread.join()
+
+
+def submit_pages(
+    pages: Iterable[Tuple[str, bytes]],
+    parse_page,
+    arguments: dict,
+    executor: ProcessPoolExecutor,
+    completed: queue.Queue,
+    slots: threading.Semaphore,
+    stop_event: threading.Event,
+):
+    """
+    Submits every page to the process pool, queueing each parse once it completes.
+
+    Queues (key, future) once a parse completes and (key, None) for pages without
+    content or that cannot be submitted. Queues (PARSE_DONE, number of submitted parses)
+    once every page has been submitted, or the exception raised by pages.
+
+    Parameters
+    ----------
+    pages: Iterable[Tuple[str, bytes]]
+        (key, content) pairs, e.g. the output of crawl
+    parse_page
+        Module level function called as parse_page(content, *arguments[key])
+    arguments: dict
+        Dictionary of extra positional arguments passed to parse_page
+    executor: ProcessPoolExecutor
+        Process pool parsing the pages
+    completed: queue.Queue
+        Queue receiving the completed parses
+    slots: threading.Semaphore
+        Semaphore bounding the pages submitted but not yet taken from the queue
+    stop_event: threading.Event
+        Event set once the caller stops taking records
+    """
+    num_submitted = 0
+    try:
+        for key, content in pages:
+            if content is None:
+                completed.put((key, None))
+                continue
+            while not slots.acquire(timeout=SLOT_POLL_INTERVAL):
+                if stop_event.is_set():
+                    return
+            if stop_event.is_set():
+                return
+            try:
+                future = executor.submit(parse_page, content, *arguments.get(key, ()))
+            except BrokenProcessPool as error:
+                slots.release()
+                print("Unable to parse", key, repr(error))
+                completed.put((key, None))
+                continue
+            future.add_done_callback(lambda future, key=key: completed.put((key, future)))
+            num_submitted += 1
+        completed.put((PARSE_DONE, num_submitted))
+    except Exception as error:  # pylint: disable=broad-except
+        completed.put(error)
+    finally:
+        # stop the crawl feeding the pages if the caller stopped early
+        if hasattr(pages, "close"):
+            pages.close()
+
+
+def get_parse_result(key: str, future: Future) -> object:
+    """
+    Return the record of a completed parse, None if the parser failed.
+
+    Parameters
+    ----------
+    key: str
+        Identifier of the parsed page
+    future: Future
+        Completed future of the parse
+
+    Returns
+    -------
+    object
+        Record returned by the parser, None if it raised or its worker died
+    """
+    try:
+        return future.result()
+    except Exception as error:  # pylint: disable=broad-except
+        print("Unable to parse", key, repr(error))
+        return None
+
+
+def get_parse_executor(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Creates the process pool used to parse pages.
+
+    Workers are started from a fork server where the platform supports one, so they are
+    never forked from a process with crawl threads running.
+
+    Parameters
+    ----------
+    max_workers: int
+        Number of worker processes
+
+    Returns
+    -------
+    ProcessPoolExecutor
+        Process pool with max_workers workers
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # import the parsers once in the server rather than in every worker
+        context.set_forkserver_preload(["wasp_tool.utilities"])
+    else:
+        context = multiprocessing.get_context()
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
@@ -5,59 +5,113 @@ different file types to the AWS bucket.
 FUNCTIONS
     standardize_satellite(sat_name: str)
         Standardizes a satellite name according to pre-defined rules.
+    standardize_satellites(sat_names: pd.Series) -> pd.Series
+        Standardizes a column of satellite names, see standardize_satellite.
     save_dict_to_csv(aws_bucket: str, dict_: dict, key: str)
         Saves dictionary to a csv file in the AWS bucket.
-    save_footprints(
-        aws_client: botocore.client,
-        aws_bucket: str,
-        sat_names: list,
-        footprints: list
+    save_df_to_csv(
+        bucket: str,
+        client: boto3.client,
+        df: pd.DataFrame,
+        filename: str,
+        parquet: bool
     )
-        Saves satbeams footprints to the AWS bucket.
-    image_download(
-        sat_name: str,
-        image_links: list,
-        image_titles: list,
-        iter: int,
-        queue_for_image_encodings: queue.Queue,
-        queue_for_image_titles: queue.Queue,
-    )
-        Download footprint images.
-    save_tables(aws_bucket: str, dict_: dict)
-        Saves lyngsat channels tables to the AWS bucket.
-    save_pdfs(
-        aws_client: botocore.client,
-        aws_bucket: str,
-        names: list,
-        urls: list
-    )
-        Saves altervista frequency plans to the AWS bucket.
+        Saves dataframe to a csv file, and optionally a parquet file, in the AWS bucket.
+    get_csv_objects(df: pd.DataFrame, filename: str, parquet: bool, typed: bool) -> dict
+        Return the csv object, and optionally the parquet object, of a dataframe.
+    get_parquet_body(csv_text: str, df: pd.DataFrame) -> bytes
+        Converts csv text to compressed parquet with typed columns.
+    get_parquet_key(filename: str) -> str
+        Return the key of the parquet file written next to a csv file.
+    get_table_objects(dict_: dict, parquet: bool) -> dict
+        Return the objects of every lyngsat channels table and the consolidated file.
+    get_channel_store(dict_: dict) -> Tuple[bytes, dict]
+        Concatenates every channels table into one csv file indexed by satellite.
 """
 import json
 import pickle
-import queue
-import shutil
-import threading
-import time
-from io import BytesIO
+import re
+from functools import lru_cache
+from io import BytesIO, StringIO
+from typing import Tuple
 
-import botocore
 import pandas as pd
-import requests
-from PIL import Image
-from tqdm import tqdm
-import numpy as np
 import boto3
 
+from wasp_tool.utilities.publish_utilities import publish_snapshot
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 # define http response success
 HTTP_SUCCESS = 200
 
-
-def standardize_satellite(sat_name: str) -> str: #FIX ME
+# define compression codec of parquet files
+PARQUET_COMPRESSION = "zstd"
+
+# define keys of the consolidated channels file and its satellite index
+CHANNEL_STORE_KEY = "channels.csv"
+CHANNEL_INDEX_KEY = "channels_index.json"
+
+# define number of standardized satellite names remembered
+STANDARDIZED_NAME_CACHE_SIZE = 4096
+
+# define sub-strings replaced for consistency, only the first one found is replaced
+NAME_REPLACEMENTS = {
+    "G-SAT": "GSAT",
+    "HELLASSAT": "HELLAS SAT",
+    "HELLAS-SAT": "HELLAS SAT",
+    "HOTBIRD": "HOT BIRD",
+}
+NAME_REPLACEMENT_PATTERN = re.compile("|".join(map(re.escape, NAME_REPLACEMENTS)))
+
+# define sub-strings of names whose first space is replaced with a dash
+DASH_ADD = [
+    "ABS",
+    "AMC",
+    "AMOS",
+    "ARABSAT",
+    "ATHENA FIDUS",
+    "BADR",
+    "BSAT",
+    "BEIDOU ",
+    "BULGARIASAT",
+    "CIEL",
+    "CMS",
+    "EXPRESS AT",
+    "EXPRESS AM",
+    "GSAT",
+    "HORIZONS",
+    "INSAT",
+    "JCSAT",
+    "KAZSAT",
+    "MEASAT",
+    "NSS",
+    "PAKSAT",
+    "PSN",
+    "SES",
+    "TKSAT",
+    "VIASAT",
+    "VINASAT",
+    "WILDBLUE",
+    "XM ",
+]
+DASH_ADD_PATTERN = re.compile("|".join(map(re.escape, DASH_ADD)))
+
+# define sub-strings of names whose first dash is replaced with a space
+DASH_REMOVE = ["EXPRESS AMU", "THURAYA"]
+DASH_REMOVE_PATTERN = re.compile("|".join(map(re.escape, DASH_REMOVE)))
+
+
+@lru_cache(maxsize=STANDARDIZED_NAME_CACHE_SIZE)
+def standardize_satellite(sat_name: str) -> str:
     """
     Standardizes a satellite name according to pre-defined rules.
 
-    These rules were compiled from knowledge of different site nomenclatures.
+    These rules were compiled from knowledge of different site nomenclatures. The same
+    names are standardized for every source, so results are memoized.
 
     Parameters
     ----------
@@ -69,84 +123,53 @@ def standardize_satellite(sat_name: str) -> str: #FIX ME
     new_name: str
         String containing standardized satellite name
     """
-    # strip end parenthesis
-    name_replace = sat_name.replace(")", "")
-    # strip leading/following spaces
-    name_strip = name_replace.strip()
+    # strip end parenthesis and leading/following spaces, cast whole string to upper
+    name_upper = sat_name.replace(")", "").strip().upper()
 
-    # cast whole string to upper
-    name_upper = name_strip.upper()
-
-    # ALTERVISTA SPECIFIC ONE-OFF CASES
-    # if 'TÃ¼RKMENÃLEM' in name_upper():
-    #     name_upper = name_upper.replace('TÃ¼RKMENÃLEM', 'TURKMENÄLEM')
-
-    if "TURKSAT" in name_upper:
-        name_upper = name_upper.replace("TURKSAT", "TÜRKSAT")
-
-    if ("INTELSA") in name_upper and ("INTELSAT" not in name_upper):
+    name_upper = name_upper.replace("TURKSAT", "TÜRKSAT")
+    if "INTELSA" in name_upper and "INTELSAT" not in name_upper:
         name_upper = name_upper.replace("INTELSA", "INTELSAT")
 
-    # CASE 1: replacing sub-strings for consistency
-    case_1 = {
-        "G-SAT": "GSAT",
-        "HELLASSAT": "HELLAS SAT",
-        "HELLAS-SAT": "HELLAS SAT",
-        "HOTBIRD": "HOT BIRD",
-    }
-    for substring in case_1.keys():
-        if substring in name_upper:
-            name_upper = name_upper.replace(substring, case_1[substring])
-            break
+    # CASE 1: replacing the first listed sub-string found for consistency
+    found = NAME_REPLACEMENT_PATTERN.findall(name_upper)
+    if found:
+        substring = next(key for key in NAME_REPLACEMENTS if key in found)
+        name_upper = name_upper.replace(substring, NAME_REPLACEMENTS[substring])
 
     # CASE 2: hot birds are eutelsats
-    if ("HOT BIRD" in name_upper) and ("EUTELSAT" not in name_upper):
+    if "HOT BIRD" in name_upper and "EUTELSAT" not in name_upper:
         name_upper = name_upper.replace("HOT BIRD", "EUTELSAT HOT BIRD")
 
     # CASE 3: replacing white space with dashes
-    dash_add = [
-        "ABS",
-        "AMC",
-        "AMOS",
-        "ARABSAT",
-        "ATHENA FIDUS",
-        "BADR",
-        "BSAT",
-        "BEIDOU ",
-        "BULGARIASAT",
-        "CIEL",
-        "CMS",
-        "EXPRESS AT",
-        "EXPRESS AM",
-        "GSAT",
-        "HORIZONS",
-        "INSAT",
-        "JCSAT",
-        "KAZSAT",
-        "MEASAT",
-        "NSS",
-        "PAKSAT",
-        "PSN",
-        "SES",
-        "TKSAT",
-        "VIASAT",
-        "VINASAT",
-        "WILDBLUE",
-        "XM ",
-    ]
-
-    if (any(substring in name_upper for substring in dash_add)) and (
-        "SERIES" not in name_upper
-    ):
+    if DASH_ADD_PATTERN.search(name_upper) and "SERIES" not in name_upper:
         name_upper = name_upper.replace(" ", "-", 1)
 
     # CASE 4: replacing dashes with white space
-    dash_remove = ["EXPRESS AMU", "THURAYA"]
-    if any(substring in name_upper for substring in dash_remove):
+    if DASH_REMOVE_PATTERN.search(name_upper):
         name_upper = name_upper.replace("-", " ", 1)
 
-    new_name = name_upper
-    return new_name
+    return name_upper
+
+
+def standardize_satellites(sat_names: pd.Series) -> pd.Series:
+    """
+    Standardizes a column of satellite names, see standardize_satellite.
+
+    A column repeats the same few names, so each unique name is standardized once and the
+    results are mapped back onto the column.
+
+    Parameters
+    ----------
+    sat_names: pd.Series
+        Series of satellite names, missing names stay missing
+
+    Returns
+    -------
+    pd.Series
+        Series of standardized satellite names with the same index
+    """
+    unique_names = sat_names.dropna().unique()
+    return sat_names.map(dict(zip(unique_names, map(standardize_satellite, unique_names))))
 
 
 def save_dict_to_json(aws_bucket: str, dictionary: dict, filename: str):
@@ -184,211 +207,208 @@ def save_dict_to_pkl(aws_bucket: str, dictionary: dict, filename: str):
         pickle.dump(dictionary, handle)
 
 
-def save_df_to_csv(bucket: str, client: boto3.client, df: pd.DataFrame, filename: str):
+def save_df_to_csv(
+    bucket: str,
+    client: boto3.client,
+    df: pd.DataFrame,
+    filename: str,
+    parquet: bool = False,
+):
     """
-    Saves dataframe to a csv file in the AWS bucket.
+    Saves dataframe to a csv file, and optionally a parquet file, in the AWS bucket.
+
+    The files are published as a new snapshot, see publish_snapshot.
 
     Parameters
     ----------
-    aws_bucket: str
+    bucket: str
         AWS bucket name
+    client: boto3.client
+        AWS boto3 client object
     df: pd.DataFrame
         Dataframe to write to csv
     filename: str
         String containing filename to save the csv file to in the bucket
+    parquet: bool
+        Whether to also write a parquet file
     """
-    # Save the DataFrame to a CSV file
-
-    client.put_object(Bucket=bucket,Key=filename,Body= df.to_csv(index=False))
-    
-
-
-# def save_footprints(
-#     aws_client: botocore.client, aws_bucket: str, sat_names: list, footprints: list
-# ):
-#     """
-#     Saves satbeams footprints to the AWS bucket.
-
-#     Runs threads to download images before saving to bucket.
-
-#     Parameters
-#     ----------
-#     aws_client: botocore.client
-#         AWS boto3 client object
-#     aws_bucket: str
-#         AWS bucket name
-#     sat_names: list
-#         List of satellite names
-#     footprints: list
-#         List of footprint image hrefs
-#     """
-#     image_encoding_dict = {}
-
-#     images, titles = footprints[1][0], footprints[1][1]
-
-#     q_image_encod = queue.Queue()
-#     q_image_title = queue.Queue()
-#     jobs = []
-
-#     for k, sat in enumerate(sat_names):
-#         thread = threading.Thread(
-#             target=image_download,
-#             args=(sat, images, titles, k, q_image_encod, q_image_title),
-#         )
-#         jobs.append(thread)
-
-#     for j in jobs:
-#         threads = threading.active_count()
-#         while threads > 4:
-#             time.sleep(5)
-#             threads = threading.active_count()
-#         j.start()
-#         encodings = q_image_encod.get()
-#         encod_titles = q_image_title.get()
-#         for i in range(len(encodings)):
-#             image_encoding_dict[encod_titles[i]] = encodings[i]
-#     for j in jobs:
-#         j.join()
-
-#     pickle_byte_obj = pickle.dumps(image_encoding_dict)
-#     # / causes problem with directory name
-#     if "/" in key:
-#         key = key.replace("/", "-")
-#     key_final = f"{key}/{key}.pkl"
-#     filename = f"footprints/{key_final}"
-#     aws_client.put_object(Bucket=aws_bucket, Key=filename,
-#                             Body=pickle_byte_obj)
-
-
-
-# def image_download(
-#     sat_name: str,
-#     image_links: list,
-#     image_titles: list,
-#     iter_: int,
-#     queue_for_image_encodings: queue.Queue,
-#     queue_for_image_titles: queue.Queue,
-# ):
-#     """
-#     Download footprint images.
-
-#     Parameters
-#     ----------
-#     sat_name: str
-#         String containing satellite name
-#     image_links: list
-#         List of footprint image hrefs
-#     image_titles: list
-#         List of footprint image titles
-#     iter_: int
-#         Iterator to keep track of list elements needed for a given satellite
-#     queue_for_image_encodings: queue.Queue
-#         Queue to put satellite footprint image encodings onto.
-#     queue_for_image_titles: queue.Queue
-#         Queue to put satellite footprint image titles onto.
-#     """
-#     encodings = []
-#     titles = []
-#     try:
-#         sat_images = image_links[iter_]
-#         sat_titles = image_titles[iter_]
-#         # download and save images
-#         print("Downloading images for", sat_images)
-#         for i, image in tqdm(enumerate(sat_images)):
-#             try:
-#                 jpg_name = f"{sat_titles[i]}.jpg"
-#             except:
-#                 print("Unable to download image")
-
-#             try:
-#                 response = requests.get(image, stream=True)  # Heroku has specified timeout
-#                 if response.status_code == HTTP_SUCCESS:
-#                     response.raw.decode_content = True
-#                     in_mem_file = BytesIO()
-#                     shutil.copyfileobj(response.raw, in_mem_file)
-#                     response.close()
-#                     in_mem_file.seek(0)
-#                     # create image encoding
-#                     img = Image.open(in_mem_file)
-#                     # add encoding to dict
-#                     encodings.append(img)
-#                     titles.append(f"{sat_name}/{sat_titles[i]}")
-#                     print("Image download successful")
-#             except:
-#                 print("Unable to download image", sat_name, jpg_name)
-#         queue_for_image_encodings.put(encodings)
-#         queue_for_image_titles.put(titles)
-#     except:
-#         print("Unable to download images")
-#         pass
-
-
-def save_tables(aws_client: botocore.client, aws_bucket: str, dict_: dict):
+    dataset = filename[: -len(".csv")]
+    publish_snapshot(client, bucket, get_csv_objects(df, filename, parquet), dataset)
+
+
+def get_csv_objects(
+    df: pd.DataFrame, filename: str, parquet: bool = False, typed: bool = False
+) -> dict:
     """
-    Saves lyngsat channels tables to the AWS bucket.
+    Return the csv object, and optionally the parquet object, of a dataframe.
+
+    The parquet object is keyed next to the csv object with the same name and a .parquet
+    extension. The csv object is always included so older readers keep working.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        Dataframe to write to csv
+    filename: str
+        String containing filename of the csv file in the bucket
+    parquet: bool
+        Whether to also include a parquet object
+    typed: bool
+        Whether the dataframe columns already hold their final types, the parquet object
+        is then written from the dataframe instead of the csv text
+
+    Returns
+    -------
+    objects: dict
+        Dictionary of objects
+        key: filename in the bucket
+        value: bytes of the file
+    """
+    csv_text = df.to_csv(index=False)
+    objects = {filename: csv_text.encode("utf-8")}
+    if parquet:
+        body = get_parquet_body(csv_text, df if typed else None)
+        if body is not None:
+            objects[get_parquet_key(filename)] = body
+    return objects
+
+
+def get_parquet_body(csv_text: str, df: pd.DataFrame = None) -> bytes:
+    """
+    Converts csv text to compressed parquet with typed columns.
+
+    Without a dataframe the columns are read back from the csv text, so the parquet file
+    holds exactly the values and types a reader of the csv file sees (e.g. footprint lists
+    stay strings).
+
+    Parameters
+    ----------
+    csv_text: str
+        String containing the csv file
+    df: pd.DataFrame
+        Dataframe with typed columns to write instead of the csv text, None reads the csv
+        text
+
+    Returns
+    -------
+    bytes
+        Bytes of the parquet file, None if pyarrow is not installed or the data cannot
+        be converted
+    """
+    if pyarrow is None:
+        print("pyarrow is not installed, skipping parquet output")
+        return None
+    try:
+        if df is None:
+            df = pd.read_csv(StringIO(csv_text))
+        buffer = BytesIO()
+        df.to_parquet(buffer, engine="pyarrow", compression=PARQUET_COMPRESSION, index=False)
+    except (pd.errors.EmptyDataError, pyarrow.ArrowException, ValueError) as error:
+        print("Unable to convert to parquet", repr(error))
+        return None
+    return buffer.getvalue()
+
+
+def get_parquet_key(filename: str) -> str:
+    """
+    Return the key of the parquet file written next to a csv file.
+
+    Parameters
+    ----------
+    filename: str
+        String containing the key of the csv file
+
+    Returns
+    -------
+    str
+        String containing the key of the parquet file
+    """
+    return filename[: -len(".csv")] + ".parquet"
+
+
+def get_table_objects(dict_: dict, parquet: bool = False) -> dict:
+    """
+    Return the objects of every lyngsat channels table and the consolidated file.
+
+    Each table is stored in its own file, and every table is also stored in the
+    consolidated channels file with its satellite index, see get_channel_store.
 
     Parameters
     ----------
-    aws_bucket: str
-        AWS bucket name
     dict_: dict
         Dictionary of channels tables
+    parquet: bool
+        Whether to also include a parquet object next to each csv object
+
+    Returns
+    -------
+    objects: dict
+        Dictionary of objects
+        key: filename in the bucket
+        value: bytes of the file
     """
+    objects = {}
     for key, val in dict_.items():
         # / causes problem with directory name
         if "/" in key:
             key = key.replace("/", "-")
         key_final = f"{key}/{key}.csv"
         filename = f"channels/{key_final}"
-        aws_client.put_object(Bucket=aws_bucket, Key=filename,Body= val.to_csv(index=False))
+        objects.update(get_csv_objects(val, filename, parquet))
+    store_body, store_index = get_channel_store(dict_)
+    objects[CHANNEL_STORE_KEY] = store_body
+    objects[CHANNEL_INDEX_KEY] = json.dumps(store_index).encode("utf-8")
+    return objects
 
 
-def save_pdfs(aws_client: botocore.client, aws_bucket: str, names: list, urls: list):
+def get_channel_store(dict_: dict) -> Tuple[bytes, dict]:
     """
-    Saves altervista frequency plans to the AWS bucket.
+    Concatenates every channels table into one csv file indexed by satellite.
+
+    The file is a plain csv file with a leading "Satellite" column, so batch jobs can
+    read every channel in one request. The rows of each satellite are contiguous and the
+    index records their byte range, so a reader can fetch a single satellite's rows with
+    a range request and parse them with the header stored in the index.
 
     Parameters
     ----------
-    aws_client: botocore.client
-        AWS boto3 client object
-    aws_bucket: str
-        AWS bucket name
-    names: list
-        List of satellite names
-    urls: list
-        List of satellite frequency plan urls
+    dict_: dict
+        Dictionary of channels tables
+        key: satellite's primary name
+        value: pd.DataFrame table
+
     Returns
+    -------
+    Tuple[bytes, dict]
+
+    body: bytes
+        Bytes of the consolidated csv file
+    index: dict
+        Dictionary containing the key, size and header of the consolidated file and the
+        [offset, length] byte range of each satellite's rows
     """
-    # for i, url in enumerate(urls):
-    #     sat_name = names[i]
-    #     file_path = f"data/freq_plans/{sat_name}/"
-    #     try:
-    #         req = requests.get(url)
-    #         req.close()
-    #         pdf_name = f"{sat_name}.pdf"
-    #         # write pdf to s3 bucket
-    #         aws_client.put_object(
-    #             Body=req.content, Bucket=aws_bucket, Key=file_path + pdf_name
-    #         )
-    #         # read pdf from s3 bucket
-    #         obj = aws_client.get_object(Bucket=aws_bucket, Key=file_path + pdf_name)[
-    #             "Body"
-    #         ].read()
-    #         pdf = pdfium.PdfDocument(BytesIO(obj))
-
-    #         n_pages = len(pdf)
-    #         # save pdf as new jpg
-    #         for i in range(n_pages):
-    #             jpg_name = f"{sat_name}_{str(i)}.jpg"
-    #             page = pdf[i]
-    #             in_mem_file = BytesIO()
-    #             pil_image = page.render().to_pil()
-    #             pil_image.save(in_mem_file, format="JPEG")
-    #             in_mem_file.seek(0)
-    #             aws_client.put_object(
-    #                 Body=in_mem_file, Bucket=aws_bucket, Key=file_path + jpg_name
-    #             )
-
-    #         print("File", sat_name, "downloaded successfully")
-    #     except:
-    #         print("File", sat_name, "unable to download")
+    columns = ["Satellite"]
+    for table in dict_.values():
+        columns.extend(str(column) for column in table.columns if column not in columns)
+    header = pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8")
+
+    chunks = [header]
+    offset = len(header)
+    satellites = {}
+    for key, table in dict_.items():
+        rows = table.copy()
+        rows.columns = [str(column) for column in rows.columns]
+        rows.insert(0, "Satellite", key)
+        chunk = rows.reindex(columns=columns).to_csv(index=False, header=False).encode("utf-8")
+        satellites[key] = [offset, len(chunk)]
+        chunks.append(chunk)
+        offset += len(chunk)
+
+    index = {
+        "key": CHANNEL_STORE_KEY,
+        "size": offset,
+        "header": header.decode("utf-8"),
+        "satellites": satellites,
+    }
+    return b"".join(chunks), index
+
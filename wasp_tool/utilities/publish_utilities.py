@@ -0,0 +1,483 @@
+"""
+This module defines a bulk publisher that uploads many objects to the AWS bucket
+concurrently through one shared client, and the versioned snapshots the backend publishes
+its datasets as.
+
+Each publish uploads its objects under a new snapshot prefix, then replaces manifest.json,
+which maps every dataset key (e.g. "satbeams.csv") to the snapshot object holding its
+current content. Snapshot objects are never overwritten, so readers never see a partially
+written dataset, and the manifest version tells them whether anything changed. Objects
+whose sha256 hash matches the manifest are not uploaded again.
+
+The backend and every worker of the Dash app publish to the same manifest, so it is only
+replaced if it is unchanged since it was loaded, otherwise it is loaded again and the
+update is retried.
+
+FUNCTIONS
+    def publish_snapshot(
+        aws_client: botocore.client, aws_bucket: str, objects: dict, dataset: str
+    ) -> dict:
+        Uploads a dataset's changed objects under a new snapshot prefix and points the
+        manifest at them.
+    def update_manifest(
+        aws_client: botocore.client,
+        aws_bucket: str,
+        version: str,
+        dataset: str,
+        entries: dict,
+        published_keys: set
+    ) -> dict:
+        Replaces a dataset's entries in the manifest and writes it.
+    def load_manifest(aws_client: botocore.client, aws_bucket: str) -> dict:
+        Loads the manifest from the AWS bucket.
+    def load_manifest_with_etag(aws_client: botocore.client, aws_bucket: str) -> tuple:
+        Loads the manifest from the AWS bucket with the ETag of the manifest object.
+    def load_published_object(aws_client: botocore.client, aws_bucket: str, key: str) -> bytes:
+        Loads the current content of a published dataset key.
+    def prune_snapshots(aws_client: botocore.client, aws_bucket: str, manifest: dict):
+        Deletes snapshot objects no longer referenced by the manifest.
+    def get_snapshot_version() -> str:
+        Return a new, sortable snapshot version.
+    def upload_objects(
+        aws_client: botocore.client,
+        aws_bucket: str,
+        objects: dict,
+        max_workers: int,
+        extra_args: dict,
+        report: bool
+    ) -> dict:
+        Uploads every object concurrently and reports the aggregate throughput.
+    def upload_object(
+        aws_client: botocore.client, aws_bucket: str, key: str, body: bytes, extra_args: dict
+    ):
+        Uploads a single object, using a multipart transfer for large payloads.
+"""
+import hashlib
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+import botocore
+from boto3.s3.transfer import TransferConfig
+
+# define number of simultaneous uploads, the client's connection pool must be as large
+MAX_UPLOAD_WORKERS = 32
+
+# define payload size in bytes above which uploads are split into parts
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+# define transfer settings of each upload
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_THRESHOLD,
+    max_concurrency=4,
+)
+
+# define key prefix of snapshot objects
+SNAPSHOT_PREFIX = "snapshots/"
+
+# define key of the manifest pointing every dataset key at its snapshot object
+MANIFEST_KEY = "manifest.json"
+
+# define age in seconds after which unreferenced snapshot objects are deleted, readers
+# that loaded an older manifest keep reading its objects until then
+SNAPSHOT_RETENTION = 24 * 60 * 60
+
+# define number of attempts at replacing the manifest while other publishers replace it
+MANIFEST_ATTEMPTS = 10
+
+# define maximum wait in seconds before loading a manifest replaced by another publisher
+MANIFEST_RETRY_DELAY = 0.5
+
+
+def upload_objects(
+    aws_client: botocore.client,
+    aws_bucket: str,
+    objects: dict,
+    max_workers: int = MAX_UPLOAD_WORKERS,
+    extra_args: dict = None,
+    report: bool = True,
+) -> dict:
+    """
+    Uploads every object concurrently and reports the aggregate throughput.
+
+    A failed upload is reported and does not stop the other uploads.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object, shared by every upload
+    aws_bucket: str
+        AWS bucket name
+    objects: dict
+        Dictionary of objects to upload
+        key: object key in the bucket
+        value: bytes of the object
+    max_workers: int
+        Number of simultaneous uploads
+    extra_args: dict
+        Extra arguments of every upload, e.g. {"ContentType": "image/jpeg"}
+    report: bool
+        Whether to print the throughput, callers uploading in many batches report
+        their totals themselves
+
+    Returns
+    -------
+    stats: dict
+        Dictionary containing the number of objects and bytes uploaded, the elapsed
+        time in seconds and the keys of the failed uploads
+    """
+    start_time = time.time()
+    uploaded_bytes = 0
+    failed_keys = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(upload_object, aws_client, aws_bucket, key, body, extra_args): key
+            for key, body in objects.items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                future.result()
+            except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as error:
+                print("Unable to upload", key, repr(error))
+                failed_keys.append(key)
+                continue
+            uploaded_bytes += len(objects[key])
+    elapsed_time = time.time() - start_time
+
+    stats = {
+        "objects": len(objects) - len(failed_keys),
+        "bytes": uploaded_bytes,
+        "seconds": elapsed_time,
+        "failed": failed_keys,
+    }
+    if not report:
+        return stats
+    print(
+        "Uploaded {:d} objects, {:.2f} MB in {:.2f} s ({:.2f} MB/s), {:d} failed".format(
+            stats["objects"],
+            uploaded_bytes / 1e6,
+            elapsed_time,
+            uploaded_bytes / 1e6 / max(elapsed_time, 1e-9),
+            len(failed_keys),
+        )
+    )
+    return stats
+
+
+def upload_object(
+    aws_client: botocore.client,
+    aws_bucket: str,
+    key: str,
+    body: bytes,
+    extra_args: dict = None,
+):
+    """
+    Uploads a single object, using a multipart transfer for large payloads.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    key: str
+        Object key in the bucket
+    body: bytes
+        Bytes of the object
+    extra_args: dict
+        Extra arguments of the upload, e.g. {"ContentType": "image/jpeg"}
+    """
+    aws_client.upload_fileobj(
+        BytesIO(body), aws_bucket, key, ExtraArgs=extra_args, Config=TRANSFER_CONFIG
+    )
+
+
+def publish_snapshot(
+    aws_client: botocore.client, aws_bucket: str, objects: dict, dataset: str
+) -> dict:
+    """
+    Uploads a dataset's changed objects under a new snapshot prefix and points the
+    manifest at them.
+
+    Only objects whose content changed since the previous publish are uploaded, the
+    others keep pointing at the snapshot object holding their unchanged content. The
+    manifest is only replaced once every object has been uploaded, and only if anything
+    changed. Objects that failed to upload keep pointing at their previous snapshot, and
+    objects the dataset no longer contains (e.g. a parquet copy no longer written) are
+    removed from it.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    objects: dict
+        Dictionary of objects to publish
+        key: dataset key, e.g. "satbeams.csv"
+        value: bytes of the object
+    dataset: str
+        Name of the dataset the objects make up, e.g. "satbeams"
+
+    Returns
+    -------
+    stats: dict
+        Upload statistics, see upload_objects, with the snapshot version and the number
+        of unchanged objects and bytes that were not uploaded
+    """
+    version = get_snapshot_version()
+    previous_objects = load_manifest(aws_client, aws_bucket)["objects"]
+
+    entries = {}
+    changed_objects = {}
+    skipped_bytes = 0
+    for key, body in objects.items():
+        digest = hashlib.sha256(body).hexdigest()
+        previous = previous_objects.get(key)
+        if previous is not None and previous["sha256"] == digest:
+            skipped_bytes += len(body)
+            if previous.get("dataset") != dataset:
+                entries[key] = {**previous, "dataset": dataset}
+            continue
+        changed_objects[key] = body
+        entries[key] = {
+            "key": f"{SNAPSHOT_PREFIX}{version}/{key}",
+            "size": len(body),
+            "sha256": digest,
+            "version": version,
+            "dataset": dataset,
+        }
+
+    stats = upload_objects(
+        aws_client,
+        aws_bucket,
+        {entries[key]["key"]: body for key, body in changed_objects.items()},
+    )
+    for key in changed_objects:
+        if entries[key]["key"] in stats["failed"]:
+            del entries[key]
+    removed_keys = [
+        key
+        for key, entry in previous_objects.items()
+        if entry.get("dataset") == dataset and key not in objects
+    ]
+    if entries or removed_keys:
+        manifest = update_manifest(
+            aws_client, aws_bucket, version, dataset, entries, set(objects)
+        )
+        prune_snapshots(aws_client, aws_bucket, manifest)
+
+    stats["version"] = version
+    stats["skipped"] = len(objects) - len(changed_objects)
+    stats["skipped_bytes"] = skipped_bytes
+    print(
+        "Skipped {:d} unchanged {:s} objects, {:.2f} MB not uploaded".format(
+            stats["skipped"], dataset, skipped_bytes / 1e6
+        )
+    )
+    return stats
+
+
+def update_manifest(
+    aws_client: botocore.client,
+    aws_bucket: str,
+    version: str,
+    dataset: str,
+    entries: dict,
+    published_keys: set,
+) -> dict:
+    """
+    Replaces a dataset's entries in the manifest and writes it.
+
+    Sources publish independently, so the entries of the other datasets are kept. The
+    manifest is written with a conditional put on the ETag it was loaded with, if another
+    publisher replaced it in the meantime the manifest is loaded again and the entries are
+    applied to it, up to MANIFEST_ATTEMPTS times.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    version: str
+        Snapshot version of the new entries
+    dataset: str
+        Name of the dataset the entries belong to
+    entries: dict
+        Dictionary of manifest entries
+        key: dataset key
+        value: dictionary of the snapshot object's key, size, sha256 hash, version and
+        dataset
+    published_keys: set
+        Every dataset key of the publish, including those that failed to upload, the
+        dataset's other entries are removed
+
+    Returns
+    -------
+    manifest: dict
+        Dictionary containing the manifest version, update time and objects
+
+    Raises
+    ------
+    botocore.exceptions.ClientError
+        If the manifest was replaced by other publishers on every attempt
+    """
+    for attempt in range(1, MANIFEST_ATTEMPTS + 1):
+        manifest, etag = load_manifest_with_etag(aws_client, aws_bucket)
+        manifest["objects"] = {
+            key: entry
+            for key, entry in manifest["objects"].items()
+            if entry.get("dataset") != dataset or key in published_keys
+        }
+        manifest["objects"].update(entries)
+        manifest["version"] = version
+        manifest["updated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        # a single put replaces the manifest atomically, and only if no other publisher
+        # replaced or created it since it was loaded
+        condition = {"IfNoneMatch": "*"} if etag is None else {"IfMatch": etag}
+        try:
+            aws_client.put_object(
+                Bucket=aws_bucket,
+                Key=MANIFEST_KEY,
+                Body=json.dumps(manifest, indent=4),
+                ContentType="application/json",
+                CacheControl="no-cache",
+                **condition,
+            )
+            break
+        except botocore.exceptions.ClientError as error:
+            # S3 answers 409 ConditionalRequestConflict to simultaneous conditional puts
+            if attempt == MANIFEST_ATTEMPTS or error.response["Error"]["Code"] not in (
+                "PreconditionFailed",
+                "ConditionalRequestConflict",
+            ):
+                raise
+            print("Manifest changed while publishing", dataset, "- retrying")
+            time.sleep(random.uniform(0, MANIFEST_RETRY_DELAY))
+    print("Published snapshot", version, "with", len(entries), "objects")
+    return manifest
+
+
+def load_manifest(aws_client: botocore.client, aws_bucket: str) -> dict:
+    """
+    Loads the manifest from the AWS bucket.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+
+    Returns
+    -------
+    manifest: dict
+        Dictionary containing the manifest version, update time and objects, with no
+        objects if nothing was published yet
+    """
+    return load_manifest_with_etag(aws_client, aws_bucket)[0]
+
+
+def load_manifest_with_etag(aws_client: botocore.client, aws_bucket: str) -> tuple:
+    """
+    Loads the manifest from the AWS bucket with the ETag of the manifest object.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+
+    Returns
+    -------
+    manifest: dict
+        Dictionary containing the manifest version, update time and objects, with no
+        objects if nothing was published yet
+    etag: str
+        String containing the ETag of the manifest object, None if nothing was
+        published yet
+    """
+    try:
+        obj = aws_client.get_object(Bucket=aws_bucket, Key=MANIFEST_KEY)
+        return json.loads(obj["Body"].read()), obj["ETag"]
+    except aws_client.exceptions.NoSuchKey:
+        return {"version": None, "updated": None, "objects": {}}, None
+
+
+def load_published_object(aws_client: botocore.client, aws_bucket: str, key: str) -> bytes:
+    """
+    Loads the current content of a published dataset key.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    key: str
+        String containing the dataset key, e.g. "footprints_index.json"
+
+    Returns
+    -------
+    bytes
+        Bytes of the snapshot object the manifest points at, None if the key was never
+        published
+    """
+    entry = load_manifest(aws_client, aws_bucket)["objects"].get(key)
+    if entry is None:
+        return None
+    return aws_client.get_object(Bucket=aws_bucket, Key=entry["key"])["Body"].read()
+
+
+def prune_snapshots(aws_client: botocore.client, aws_bucket: str, manifest: dict):
+    """
+    Deletes snapshot objects no longer referenced by the manifest.
+
+    Objects younger than SNAPSHOT_RETENTION are kept for readers of older manifests.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    manifest: dict
+        Dictionary containing the current manifest
+    """
+    referenced_keys = {entry["key"] for entry in manifest["objects"].values()}
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=SNAPSHOT_RETENTION)
+    stale_keys = []
+    paginator = aws_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=aws_bucket, Prefix=SNAPSHOT_PREFIX):
+        for obj in page.get("Contents", []):
+            if obj["Key"] not in referenced_keys and obj["LastModified"] < cutoff:
+                stale_keys.append(obj["Key"])
+    # delete_objects accepts at most 1000 keys per request
+    for i in range(0, len(stale_keys), 1000):
+        aws_client.delete_objects(
+            Bucket=aws_bucket,
+            Delete={"Objects": [{"Key": key} for key in stale_keys[i: i + 1000]], "Quiet": True},
+        )
+    if stale_keys:
+        print("Deleted", len(stale_keys), "unreferenced snapshot objects")
+
+
+def get_snapshot_version() -> str:
+    """
+    Return a new, sortable snapshot version.
+
+    Returns
+    -------
+    str
+        String containing the UTC time and a random suffix, e.g. 20240101T120000Z-1a2b3c4d
+    """
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return f"{timestamp}-{uuid.uuid4().hex[:8]}"
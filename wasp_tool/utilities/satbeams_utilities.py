@@ -3,23 +3,19 @@ This module pulls general satellite information and footprint images from satbea
 active geostationary orbits.
 
 FUNCTIONS
-    prepare_satbeams()
+    prepare_satbeams(max_per_host: int, max_workers: int)
         Generates a data dictionary containing all satellites primary names, secondary names,
         positions, norad ids, and beacon information.
         Generates a footprint list containing all satellites footprint image links.
     get_active_geostationary_satellite_urls(soup: BeautifulSoup)
          Generates a list of urls for all active geostationary satellites.
-    def run_threads(satellite_urls: list) -> Tuple[dict, list]:
-        Uses the threading module to run code concurrently reducing overall runtime.
-        Threads are used to fetch general information and footprint images for each
-        satellite.
-    def fetch_data_from_url(
-        url: str,
-        queue_for_information: queue.Queue,
-        queue_for_footprints: queue.Queue
-    ):
-        Thread wrapper for running functions to obtain general satellite information and
-        footprint images.
+    def fetch_satellite_data(
+        satellite_urls: list, max_per_host: int, max_workers: int
+    ) -> pd.DataFrame:
+        Fetches every satellite page concurrently and parses general information and
+        footprint images from the pages in worker processes.
+    def parse_satellite_information_page(content: bytes) -> list:
+        Parses general satellite information and footprint images from a satellite page.
     def get_satellite_information(soup: BeautifulSoup) -> list:
         Generates a list of information for a given satellite including primary and
         secondary names, position, NORAD ID, and beacon data.
@@ -32,13 +28,9 @@ FUNCTIONS
     def list_to_dict(information: list) -> dict:
         Convert list of lists to dictionary.
 """
-import queue
 import sys
-import threading
-import time
 from typing import Tuple
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 from wasp_tool import utilities
 
@@ -47,14 +39,27 @@ SATBEAMS_HOMEPAGE = "https://satbeams.com/satellites?status=active"
 # define http response success
 HTTP_SUCCESS = 200
 
+# define number of information and footprint columns of each satellite
+NUM_INFORMATION_COLS = 5
+NUM_FOOTPRINT_COLS = 2
 
-def prepare_satbeams() -> Tuple[dict, list]:
+
+def prepare_satbeams(
+    max_per_host: int = utilities.MAX_REQUESTS_PER_HOST, max_workers: int = None
+) -> Tuple[dict, list]:
     """
     Generates a data dictionary containing all satellites primary names, secondary names, positions,
     norad ids, and beacon information.
 
     Generates a footprint list containing all satellites footprint image links.
 
+    Parameters
+    ----------
+    max_per_host: int
+        Maximum number of simultaneous requests sent to satbeams.com
+    max_workers: int
+        Number of processes parsing satellite pages, None uses every core
+
     Returns
     -------
     data_dictionary: dict
@@ -63,13 +68,13 @@ def prepare_satbeams() -> Tuple[dict, list]:
     footprint_urls:
         List of links to each satellite's footprint images
     """
-    response = requests.get(SATBEAMS_HOMEPAGE)  # Heroku has specified timeout
-    if response.status_code == HTTP_SUCCESS:
+    response = utilities.fetch(SATBEAMS_HOMEPAGE, "satbeams")
+    if response is not None and response.status_code == HTTP_SUCCESS:
         soup = BeautifulSoup(response.text, "html.parser")
         # get all urls
         all_satellite_urls = get_active_geostationary_satellite_urls(soup)
         # extract information from all urls
-        data_df= run_threads(all_satellite_urls)
+        data_df = fetch_satellite_data(all_satellite_urls, max_per_host, max_workers)
         return data_df
     print("Unsuccessful HTTP request at ", SATBEAMS_HOMEPAGE)
     print("Exiting script...")
@@ -97,109 +102,101 @@ def get_active_geostationary_satellite_urls(soup: BeautifulSoup) -> list:
     return urls
 
 
-def run_threads(satellite_urls: list) -> Tuple[dict, list]:
+def fetch_satellite_data(
+    satellite_urls: list,
+    max_per_host: int = utilities.MAX_REQUESTS_PER_HOST,
+    max_workers: int = None,
+) -> pd.DataFrame:
     """
-    Uses the threading module to run code concurrently reducing overall runtime.
+    Fetches every satellite page concurrently and parses general information and
+    footprint images from the pages in worker processes.
 
-    Threads are used to fetch general information and footprint images for each
-    satellite.
+    Results keep the order of satellite_urls. A satellite whose page cannot be fetched
+    or parsed is left out, so no row without a name or NORAD id is published.
 
     Parameters
     ----------
     satellite_urls: list
         List of urls for all active geostationary satellites.
+    max_per_host: int
+        Maximum number of simultaneous requests sent to satbeams.com
+    max_workers: int
+        Number of processes parsing satellite pages, None uses every core
 
     Returns
     -------
-    data_dictionary, footprints: Tuple[dict, list]
-
-    data_dictionary: dict
-        Dictionary of lists containing all satellites primary names, secondary names, positions,
-        norad ids, and beacon information.
-    footprints: list
-        List of footprint image urls.
+    satellite_information: pd.DataFrame
+        Dataframe containing each satellite's primary and secondary names, position,
+        norad id, beacon information, footprint image links and footprint image titles.
     """
-    information_queue = queue.Queue()
-    footprints_queue = queue.Queue()
-
-    jobs = []
-    # create threads
-    for satellite_url in satellite_urls:
-        thread = threading.Thread(
-            target=fetch_data_from_url, args=(satellite_url, information_queue, footprints_queue)
-        )
-        jobs.append(thread)
+    # key each page by its position so the results can be put back in order
+    pages = utilities.crawl(dict(enumerate(satellite_urls)), "satbeams", max_per_host)
+    satellite_records = dict(
+        utilities.parse_pages(pages, parse_satellite_information_page, max_workers)
+    )
 
     satellite_information = []
     satellite_footprints = []
-    # run threads
-    for job in jobs:
-        # Heroku has a max thread limit so set an arbitrary one
-        max_thread = 4
-        active_threads = threading.active_count()
-        # limit active thread count
-        while active_threads > max_thread:
-            time.sleep(5)
-            active_threads = threading.active_count()
-        job.start()
-        # get satellite information from queue
-        information = information_queue.get()
+    for index, url in enumerate(satellite_urls):
+        record = satellite_records.get(index)
+        if record is None:
+            print("Unable to get satellite information at", url, "- satellite skipped")
+            continue
+        information, footprints = record
         satellite_information.append(information)
-        # get satellite footprints from queue
-        footprints = footprints_queue.get()
         if footprints is None:
             # append empty nested list for None footprints case
             footprints_placeholder_value = [[] for _ in range(2)]
             satellite_footprints.append(footprints_placeholder_value)
         else:
             satellite_footprints.append(footprints)
-    for job in jobs:
-        job.join()
 
-    satellite_information_df = pd.DataFrame(satellite_information)
-    satellite_footprints_df = pd.DataFrame(satellite_footprints)
+    print(
+        "Parsed", len(satellite_information), "of", len(satellite_urls), "satbeams satellites"
+    )
+    satellite_information_df = pd.DataFrame(
+        satellite_information, columns=range(NUM_INFORMATION_COLS)
+    )
+    satellite_footprints_df = pd.DataFrame(satellite_footprints, columns=range(NUM_FOOTPRINT_COLS))
     satellite_information = pd.concat([satellite_information_df, satellite_footprints_df], axis=1)
 
     return satellite_information
 
 
-def fetch_data_from_url(
-    url: str, queue_for_information: queue.Queue, queue_for_footprints: queue.Queue
-):
+def parse_satellite_information_page(content: bytes) -> list:
     """
-    Thread wrapper for running functions to obtain general satellite information and
-    footprint images.
+    Parses general satellite information and footprint images from a satellite page.
+
+    Runs in a parse worker process, so only plain lists are returned, never the
+    parsed html.
 
     Parameters
     ----------
-    url: str
-        String containing url to send GET request to.
-    queue_for_information: queue.Queue
-        Queue to put general satellite information onto.
-    queue_for_footprints: queue.Queue
-        Queue to put satellite footprint image urls onto.
+    content: bytes
+        Html content of a satellite page.
+
+    Returns
+    -------
+    [information, footprints]: list
+
+    information: list
+        List of general satellite information, see get_satellite_information
+    footprints: list
+        List of footprint image links and titles, see get_satellite_footprints
+
+    Returns None if the page does not have the expected layout.
     """
-    # Define max number of attempts for each requests.get
-    attempts = 5
-    for i in range(attempts):
-        try:
-            response = requests.get(url)  # Heroku has specified timeout
-            # Check if the status_code is 200
-            if response.status_code == HTTP_SUCCESS:
-                #print("Attempt", i + 1, "successful at", url) <- UNCOMMENT TO SEE STATUS
-                # Parse the HTML content of the webpage
-                soup = BeautifulSoup(response.content, "html.parser")
-                # Scrap satellite info
-                information = get_satellite_information(soup)
-                # Put satellite information on queue
-                queue_for_information.put(information)
-                # Scrap footprints
-                footprints = get_satellite_footprints(soup)
-                # Put satellite footprints on queue
-                queue_for_footprints.put(footprints)
-                break
-        except:
-            print("Attempt", i + 1, "unsuccessful HTTP request at", url)
+    # Parse the HTML content of the webpage
+    soup = BeautifulSoup(content, "html.parser")
+    try:
+        # Scrap satellite info
+        information = get_satellite_information(soup)
+        # Scrap footprints
+        footprints = get_satellite_footprints(soup)
+    except (AttributeError, IndexError, KeyError, TypeError) as error:
+        print("Unable to parse satellite page:", repr(error))
+        return None
+    return [information, footprints]
 
 
 def get_satellite_information(soup: BeautifulSoup) -> list:
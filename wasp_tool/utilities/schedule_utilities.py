@@ -0,0 +1,332 @@
+"""
+This module defines how data sources are run: once, concurrently, or by a scheduler that
+refreshes each data source on its own interval. Scheduled runs are anchored to their
+scheduled times so the period does not drift by the length of each run, and a source is
+never run again while its previous run is still in progress.
+
+FUNCTIONS
+    def run_sources(jobs: dict, max_workers: int) -> dict:
+        Runs every source once, concurrently, and prints a timing summary.
+    def run_source(source: str, job) -> Tuple[float, str]:
+        Runs a single source, isolating the caller from its failure.
+    def create_schedule(jobs: dict, intervals: dict) -> dict:
+        Creates the schedule entry of each source, restoring the next run times recorded
+        by a previous process.
+    def run_schedule(schedule: dict, max_workers: int, stop_event: threading.Event):
+        Runs every source whenever it is due until the stop event is set.
+    def run_scheduled_job(schedule: dict, source: str, wake_event: threading.Event):
+        Runs a single source and records its duration and next run time.
+    def get_next_run_time(scheduled_time: float, interval: float, now: float) -> float:
+        Return the first run time after now on the source's fixed interval grid.
+    def get_schedule_state(schedule: dict) -> dict:
+        Return the next run time, last duration and status of each source.
+    def save_schedule_state(schedule: dict):
+        Writes the schedule state to the schedule state file.
+    def load_schedule_state() -> dict:
+        Loads the schedule state written by a previous process.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Tuple
+
+from wasp_tool.utilities.utilities import create_directory, get_project_path
+
+# define default refresh interval of each source in seconds
+REFRESH_INTERVALS = {
+    "celestrak": 2 * 60 * 60,
+    "altervista": 24 * 60 * 60,
+    "satbeams": 24 * 60 * 60,
+    "lyngsat": 7 * 24 * 60 * 60,
+}
+
+# define longest time the scheduler sleeps before checking the schedule again
+MAX_SLEEP = 60
+
+# define file exposing the schedule state
+SCHEDULE_STATE_PATH = get_project_path().joinpath(".wasp_cache", "schedule.json")
+
+SCHEDULE_LOCK = threading.Lock()
+
+
+def run_sources(jobs: dict, max_workers: int = None) -> dict:
+    """
+    Runs every source once, concurrently, and prints a timing summary.
+
+    The sources hit different hosts and share no state, so a full refresh takes about
+    as long as the slowest source. A failing source does not stop the others.
+
+    Parameters
+    ----------
+    jobs: dict
+        Dictionary of jobs to run
+        key: source name
+        value: function refreshing the source, called without arguments
+    max_workers: int
+        Maximum number of sources run at once, None runs every source at once
+
+    Returns
+    -------
+    results: dict
+        Dictionary containing the duration in seconds and error of each source
+        key: source name
+        value: (duration, error), error is None if the source succeeded
+    """
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as executor:
+        futures = {
+            source: executor.submit(run_source, source, job) for source, job in jobs.items()
+        }
+        results = {source: future.result() for source, future in futures.items()}
+    wall_time = time.time() - start_time
+
+    print("Refresh summary:")
+    for source, (duration, error) in results.items():
+        status = "OK" if error is None else f"FAILED {error}"
+        print("    {:<12s}{:8.3f} mins  {:s}".format(source, duration / 60, status))
+    print(
+        "Total {:.3f} mins wall time, {:.3f} mins summed over sources".format(
+            wall_time / 60, sum(duration for duration, _ in results.values()) / 60
+        )
+    )
+    return results
+
+
+def run_source(source: str, job) -> Tuple[float, str]:
+    """
+    Runs a single source, isolating the caller from its failure.
+
+    Parameters
+    ----------
+    source: str
+        Name of the source
+    job
+        Function refreshing the source, called without arguments
+
+    Returns
+    -------
+    Tuple[float, str]
+
+    duration: float
+        Runtime of the source in seconds
+    error: str
+        Representation of the exception raised by the source, None if it succeeded
+    """
+    start_time = time.time()
+    error = None
+    try:
+        job()
+    # prepare functions exit the script when a site cannot be reached
+    except (Exception, SystemExit) as exception:  # pylint: disable=broad-except
+        error = repr(exception)
+        print(f"{source} refresh failed: {error}")
+    return time.time() - start_time, error
+
+
+def create_schedule(jobs: dict, intervals: dict = None) -> dict:
+    """
+    Creates the schedule entry of each source, restoring the next run times recorded
+    by a previous process.
+
+    Sources without a recorded next run time are due immediately.
+
+    Parameters
+    ----------
+    jobs: dict
+        Dictionary of jobs to schedule
+        key: source name
+        value: function refreshing the source, called without arguments
+    intervals: dict
+        Dictionary of refresh intervals in seconds for each source, sources not listed
+        use REFRESH_INTERVALS
+
+    Returns
+    -------
+    schedule: dict
+        Dictionary containing the schedule entry of each source
+    """
+    intervals = {**REFRESH_INTERVALS, **(intervals or {})}
+    recorded_state = load_schedule_state()
+    now = time.time()
+    schedule = {}
+    for source, job in jobs.items():
+        recorded = recorded_state.get(source, {})
+        interval = intervals[source]
+        next_run = recorded.get("next_run_timestamp", now)
+        # a changed interval must not leave the source waiting on the old one
+        next_run = min(next_run, now + interval)
+        schedule[source] = {
+            "job": job,
+            "interval": interval,
+            "next_run": next_run,
+            "last_duration": recorded.get("last_duration"),
+            "last_error": recorded.get("last_error"),
+            "running": False,
+        }
+    return schedule
+
+
+def run_schedule(
+    schedule: dict, max_workers: int = None, stop_event: threading.Event = None
+):
+    """
+    Runs every source whenever it is due until the stop event is set.
+
+    Due sources run in worker threads, so a long refresh does not hold back the other
+    sources. A source that is still running when it becomes due again is started once
+    its current run completes, at the next time on its interval grid.
+
+    Parameters
+    ----------
+    schedule: dict
+        Dictionary containing the schedule entry of each source
+    max_workers: int
+        Maximum number of sources refreshed at once, None allows every source
+    stop_event: threading.Event
+        Event that stops the scheduler once set, None runs forever
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+    wake_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=max_workers or len(schedule)) as executor:
+        while not stop_event.is_set():
+            wake_event.clear()
+            now = time.time()
+            with SCHEDULE_LOCK:
+                for source, entry in schedule.items():
+                    if not entry["running"] and entry["next_run"] <= now:
+                        entry["running"] = True
+                        executor.submit(run_scheduled_job, schedule, source, wake_event)
+                waiting = [
+                    entry["next_run"] for entry in schedule.values() if not entry["running"]
+                ]
+            # sleep until the next source is due or a running source completes
+            sleep_time = min(waiting, default=now + MAX_SLEEP) - now
+            wake_event.wait(min(max(sleep_time, 0), MAX_SLEEP))
+        print("Waiting for running sources to complete...")
+
+
+def run_scheduled_job(schedule: dict, source: str, wake_event: threading.Event):
+    """
+    Runs a single source and records its duration and next run time.
+
+    A failing source is logged and rescheduled without affecting the other sources.
+
+    Parameters
+    ----------
+    schedule: dict
+        Dictionary containing the schedule entry of each source
+    source: str
+        Name of the source to run
+    wake_event: threading.Event
+        Event set once the run completes so the scheduler re-checks the schedule
+    """
+    entry = schedule[source]
+    duration, error = run_source(source, entry["job"])
+    with SCHEDULE_LOCK:
+        entry["last_duration"] = duration
+        entry["last_error"] = error
+        entry["next_run"] = get_next_run_time(entry["next_run"], entry["interval"], time.time())
+        entry["running"] = False
+        state = get_schedule_state(schedule)
+        save_schedule_state(schedule)
+    print(
+        "{:s} refresh took {:.3f} mins, next run at {:s}".format(
+            source, entry["last_duration"] / 60, state[source]["next_run"]
+        )
+    )
+    wake_event.set()
+
+
+def get_next_run_time(scheduled_time: float, interval: float, now: float) -> float:
+    """
+    Return the first run time after now on the source's fixed interval grid.
+
+    The next run is anchored to the previous scheduled time rather than the time the
+    run completed, and runs missed while the source was busy are skipped.
+
+    Parameters
+    ----------
+    scheduled_time: float
+        Timestamp the completed run was scheduled for
+    interval: float
+        Refresh interval of the source in seconds
+    now: float
+        Current timestamp
+
+    Returns
+    -------
+    float
+        Timestamp of the next run
+    """
+    next_run = scheduled_time + interval
+    if next_run <= now:
+        missed_runs = (now - next_run) // interval + 1
+        next_run += missed_runs * interval
+    return next_run
+
+
+def get_schedule_state(schedule: dict) -> dict:
+    """
+    Return the next run time, last duration and status of each source.
+
+    Parameters
+    ----------
+    schedule: dict
+        Dictionary containing the schedule entry of each source
+
+    Returns
+    -------
+    state: dict
+        Dictionary containing the state of each source
+        key: source name
+        value: dictionary of the source's interval, next run time, last duration in
+        seconds, last error and whether it is running
+    """
+    state = {}
+    for source, entry in schedule.items():
+        state[source] = {
+            "interval": entry["interval"],
+            "next_run": datetime.fromtimestamp(entry["next_run"]).isoformat(timespec="seconds"),
+            "next_run_timestamp": entry["next_run"],
+            "last_duration": entry["last_duration"],
+            "last_error": entry["last_error"],
+            "running": entry["running"],
+        }
+    return state
+
+
+def save_schedule_state(schedule: dict):
+    """
+    Writes the schedule state to the schedule state file.
+
+    Parameters
+    ----------
+    schedule: dict
+        Dictionary containing the schedule entry of each source
+    """
+    create_directory(SCHEDULE_STATE_PATH.parent)
+    # write to a temporary file first so readers never see a partial state
+    temporary_path = f"{SCHEDULE_STATE_PATH}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(get_schedule_state(schedule), file, indent=4)
+    os.replace(temporary_path, SCHEDULE_STATE_PATH)
+
+
+def load_schedule_state() -> dict:
+    """
+    Loads the schedule state written by a previous process.
+
+    Returns
+    -------
+    state: dict
+        Dictionary containing the state of each source, empty if no state was saved
+    """
+    try:
+        with open(SCHEDULE_STATE_PATH, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
@@ -0,0 +1,336 @@
+"""
+This module extracts transponder rows from the text of the Altervista frequency plan PDFs,
+so transponder plans can be queried without opening the PDFs.
+
+Text is extracted in worker processes and the rows of each PDF are cached by its sha256
+hash, so a PDF is only read again when its content changes. The rows of every satellite
+are written to one consolidated transponders file next to the lyngsat channels file.
+
+FUNCTIONS
+    def publish_transponders(
+        aws_client: botocore.client,
+        aws_bucket: str,
+        altervista_data: pd.DataFrame,
+        frequency_plans: dict,
+        parquet: bool,
+        max_workers: int
+    ) -> dict:
+        Extracts the transponders of every changed frequency plan and publishes the
+        transponders file.
+    def extract_transponders(content: bytes) -> list:
+        Extracts the transponder rows from the text of a PDF.
+    def parse_transponder_line(line: str) -> dict:
+        Parses a line of frequency plan text into a transponder row.
+    def get_transponder_table(rows: list) -> pd.DataFrame:
+        Return a typed transponders table.
+    def load_transponder_index(aws_client: botocore.client, aws_bucket: str) -> dict:
+        Loads the transponder rows cached by a previous run.
+"""
+import hashlib
+import json
+import re
+
+import botocore
+import pandas as pd
+import pypdfium2 as pdfium
+
+from wasp_tool.utilities.parse_utilities import parse_pages
+from wasp_tool.utilities.prepare_utilities import get_csv_objects
+from wasp_tool.utilities.publish_utilities import load_published_object, publish_snapshot
+
+# define keys of the transponders file and the rows cached for each PDF
+TRANSPONDER_KEY = "transponders.csv"
+TRANSPONDER_INDEX_KEY = "transponders_index.json"
+
+# define columns and types of the transponders table
+TRANSPONDER_COLUMNS = {
+    "Transponder": "string",
+    "Frequency (MHz)": "float64",
+    "Polarization": "string",
+    "Bandwidth (MHz)": "float64",
+    "Beam": "string",
+    "Page": "Int64",
+}
+
+# define range of valid downlink and uplink frequencies in MHz
+FREQUENCY_RANGE = (1000, 60000)
+
+# define range of valid transponder bandwidths in MHz
+BANDWIDTH_RANGE = (1, 500)
+
+# define polarization spellings and their standard letter
+POLARIZATIONS = {
+    "h": "H",
+    "horizontal": "H",
+    "v": "V",
+    "vertical": "V",
+    "l": "L",
+    "lhcp": "L",
+    "left": "L",
+    "r": "R",
+    "rhcp": "R",
+    "right": "R",
+}
+
+# define patterns of the fields of a transponder line
+NUMBER_PATTERN = re.compile(r"(?<![\w.])(\d+(?:[.,]\d+)?)\s*(GHz|MHz)?(?![\w.])", re.IGNORECASE)
+POLARIZATION_PATTERN = re.compile(
+    r"(?<![\w-])(horizontal|vertical|lhcp|rhcp|left|right|[HVLR])(?![\w-])", re.IGNORECASE
+)
+TRANSPONDER_PATTERN = re.compile(r"^(?:(?:TP|Tr|Transponder)\s*)?([A-Z]{0,3}\d{1,3}[A-Z]?)\s+")
+
+
+def publish_transponders(
+    aws_client: botocore.client,
+    aws_bucket: str,
+    altervista_data: pd.DataFrame,
+    frequency_plans: dict,
+    parquet: bool = False,
+    max_workers: int = None,
+) -> dict:
+    """
+    Extracts the transponders of every changed frequency plan and publishes the
+    transponders file.
+
+    PDFs whose hash matches a previously extracted PDF reuse its cached rows. Satellites
+    whose PDF could not be downloaded keep the rows of their previous PDF.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    altervista_data: pd.DataFrame
+        Dataframe returned by prepare_altervista
+    frequency_plans: dict
+        Dictionary returned by download_frequency_plans
+    parquet: bool
+        Whether to also write a parquet copy of the transponders file
+    max_workers: int
+        Number of processes extracting text, None uses every core
+
+    Returns
+    -------
+    dict_: dict
+        Dictionary of transponders tables
+        key: satellite's primary name
+        value: pd.DataFrame table
+    """
+    previous_index = load_transponder_index(aws_client, aws_bucket)
+    extracted_rows = dict(previous_index["pdfs"])
+    plan_urls = dict(
+        zip(altervista_data["Primary Satellite"], altervista_data["Frequency Plan URL"])
+    )
+
+    pdfs = {}
+    changed_pdfs = {}
+    for url, content in frequency_plans.items():
+        digest = hashlib.sha256(content).hexdigest()
+        pdfs[url] = digest
+        if digest not in extracted_rows and digest not in changed_pdfs:
+            changed_pdfs[digest] = content
+    print("Extracting transponders from", len(changed_pdfs), "of", len(pdfs), "frequency plans")
+
+    for digest, rows in parse_pages(changed_pdfs.items(), extract_transponders, max_workers):
+        if rows is not None:
+            extracted_rows[digest] = rows
+
+    satellites = {}
+    for sat, url in plan_urls.items():
+        digest = pdfs.get(url, previous_index["satellites"].get(sat))
+        if digest in extracted_rows:
+            satellites[sat] = digest
+
+    dict_ = {}
+    for sat, digest in satellites.items():
+        table = get_transponder_table(extracted_rows[digest])
+        if not table.empty:
+            dict_[sat] = table
+    print(
+        "Extracted", sum(len(table) for table in dict_.values()), "transponders of",
+        len(dict_), "satellites",
+    )
+
+    # only the rows of PDFs still in use are kept in the cache
+    index = {
+        "satellites": satellites,
+        "pdfs": {digest: extracted_rows[digest] for digest in set(satellites.values())},
+    }
+    columns = {"Satellite": "string", **TRANSPONDER_COLUMNS}
+    if dict_:
+        transponders = pd.concat(
+            [table.assign(Satellite=sat) for sat, table in dict_.items()], ignore_index=True
+        )
+    else:
+        transponders = pd.DataFrame(columns=list(columns))
+    transponders = transponders[list(columns)].astype(columns)
+    objects = get_csv_objects(transponders, TRANSPONDER_KEY, parquet, typed=True)
+    objects[TRANSPONDER_INDEX_KEY] = json.dumps(index, sort_keys=True).encode("utf-8")
+    publish_snapshot(aws_client, aws_bucket, objects, "transponders")
+    return dict_
+
+
+def extract_transponders(content: bytes) -> list:
+    """
+    Extracts the transponder rows from the text of a PDF.
+
+    Runs in the worker processes of parse_pages, pdfium is not thread safe.
+
+    Parameters
+    ----------
+    content: bytes
+        Bytes of the PDF
+
+    Returns
+    -------
+    rows: list
+        List containing a dictionary for each transponder row, see parse_transponder_line,
+        None if the PDF cannot be read
+    """
+    rows = []
+    try:
+        pdf = pdfium.PdfDocument(content)
+        try:
+            for number, page in enumerate(pdf, start=1):
+                textpage = page.get_textpage()
+                text = textpage.get_text_bounded()
+                textpage.close()
+                page.close()
+                for line in text.splitlines():
+                    row = parse_transponder_line(line)
+                    if row is not None:
+                        row["Page"] = number
+                        rows.append(row)
+        finally:
+            pdf.close()
+    # a malformed PDF can fail anywhere in pdfium, it only drops its own transponders
+    except Exception as error:  # pylint: disable=broad-except
+        print("Unable to extract transponders", repr(error))
+        return None
+    return rows
+
+
+def parse_transponder_line(line: str) -> dict:
+    """
+    Parses a line of frequency plan text into a transponder row.
+
+    A transponder line holds a frequency and a polarization in separate columns, either
+    next to each other or following a transponder id that directly precedes the frequency,
+    so a letter in free text is not read as a polarization. The bandwidth is the first
+    plausible number following the frequency, and the beam is the text following the last
+    parsed field. A frequency given as a bare integer, which may as well be a year or a
+    count, is only accepted directly after a transponder id or followed by a bandwidth.
+
+    Parameters
+    ----------
+    line: str
+        String containing a line of PDF text
+
+    Returns
+    -------
+    row: dict
+        Dictionary of the transponder, frequency and bandwidth in MHz, polarization and
+        beam, None if the line does not describe a transponder
+    """
+    line = " ".join(line.split())
+    frequency = None
+    for match in NUMBER_PATTERN.finditer(line):
+        number = match.group(1).replace(",", ".")
+        value = float(number)
+        unit = (match.group(2) or "").lower()
+        # frequencies below 100 are given in GHz
+        if unit == "ghz" or (not unit and value < 100 and "." in number):
+            # rounded so e.g. 4.02 GHz is 4020 MHz, not 4019.9999999999995
+            value = round(value * 1000, 6)
+        if FREQUENCY_RANGE[0] <= value <= FREQUENCY_RANGE[1]:
+            frequency = match
+            frequency_mhz = value
+            bare_frequency = not unit and "." not in number
+            break
+    if frequency is None:
+        return None
+
+    transponder = TRANSPONDER_PATTERN.match(line)
+    polarization = None
+    for match in POLARIZATION_PATTERN.finditer(line):
+        if match.end() <= frequency.start():
+            adjacent = not line[match.end():frequency.start()].strip()
+        else:
+            adjacent = not line[frequency.end():match.start()].strip()
+        if adjacent:
+            polarization = match
+            break
+        # a polarization column may follow other columns on a line led by a transponder id
+        if polarization is None and match.start() >= frequency.end():
+            if transponder is not None and transponder.end() == frequency.start():
+                polarization = match
+    if polarization is None:
+        return None
+
+    bandwidth = None
+    end = max(frequency.end(), polarization.end())
+    for match in NUMBER_PATTERN.finditer(line, frequency.end()):
+        value = float(match.group(1).replace(",", "."))
+        if (match.group(2) or "").lower() == "ghz":
+            continue
+        if BANDWIDTH_RANGE[0] <= value <= BANDWIDTH_RANGE[1]:
+            bandwidth = value
+            end = max(end, match.end())
+            break
+    if bare_frequency and bandwidth is None:
+        if transponder is None or transponder.end() != frequency.start():
+            return None
+
+    beam = line[end:].strip(" -:|")
+    return {
+        "Transponder": transponder.group(1) if transponder else None,
+        "Frequency (MHz)": frequency_mhz,
+        "Polarization": POLARIZATIONS[polarization.group(1).lower()],
+        "Bandwidth (MHz)": bandwidth,
+        "Beam": beam if re.search("[A-Za-z]", beam) else None,
+    }
+
+
+def get_transponder_table(rows: list) -> pd.DataFrame:
+    """
+    Return a typed transponders table.
+
+    Parameters
+    ----------
+    rows: list
+        List of transponder rows returned by extract_transponders
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe of the transponders ordered by frequency, a transponder listed on
+        several pages is kept once
+    """
+    table = pd.DataFrame(rows, columns=list(TRANSPONDER_COLUMNS))
+    table = table.drop_duplicates(subset=["Frequency (MHz)", "Polarization", "Beam"])
+    table = table.sort_values(["Frequency (MHz)", "Polarization"], ignore_index=True)
+    return table.astype(TRANSPONDER_COLUMNS)
+
+
+def load_transponder_index(aws_client: botocore.client, aws_bucket: str) -> dict:
+    """
+    Loads the transponder rows cached by a previous run.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+
+    Returns
+    -------
+    dict
+        Dictionary containing the PDF hash of each satellite and the transponder rows of
+        each PDF hash, empty if no index was published
+    """
+    body = load_published_object(aws_client, aws_bucket, TRANSPONDER_INDEX_KEY)
+    if body is None:
+        return {"satellites": {}, "pdfs": {}}
+    return json.loads(body)
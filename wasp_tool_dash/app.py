@@ -75,9 +75,7 @@ def update_options(selected_tab, dropdown_options, sat):
         if selected_tab == 'tab-freq_plans':
             csv_path = "altervista.csv"
             try:
-                obj_freq_plans = AWS_CLIENT.get_object(
-                    Bucket=AWS_BUCKET_NAME, Key=csv_path)["Body"]
-                df = pd.read_csv(obj_freq_plans, header=0)
+                df = utilities.read_dataframe(AWS_CLIENT, AWS_BUCKET_NAME, csv_path)
                 new_options = [{'label': value, 'value': value}
                                for value in df.iloc[:, 0].tolist()]
                 return new_options, sat if sat else ""
@@ -87,9 +85,7 @@ def update_options(selected_tab, dropdown_options, sat):
         elif selected_tab == 'tab-channels':
             csv_path = "lyngsat.csv"
             try:
-                obj_lyngsat = AWS_CLIENT.get_object(
-                    Bucket=AWS_BUCKET_NAME, Key=csv_path)["Body"]
-                df = pd.read_csv(obj_lyngsat, header=0)
+                df = utilities.read_dataframe(AWS_CLIENT, AWS_BUCKET_NAME, csv_path)
                 new_options = [{'label': value, 'value': value}
                                for value in df.iloc[:, 0].tolist()]
                 return new_options, sat if sat else ""
@@ -159,11 +155,7 @@ def render_content(tab: str, value: str, aws_client=AWS_CLIENT, aws_bucket=AWS_B
     source_path = f"satbeams.csv"
     does_exist = utilities.prefix_exists(aws_client, aws_bucket, source_path)
     if does_exist:
-        obj = (
-            aws_client.get_object(Bucket=aws_bucket, Key=source_path)["Body"]
-
-        )
-        df = pd.read_csv(obj, header=0)
+        df = utilities.read_dataframe(aws_client, aws_bucket, source_path)
 
         if value in df.iloc[:, 0].values:
             df_subset = df[df.iloc[:, 0] == value]
@@ -215,9 +207,7 @@ def update_rows( sat: str):
         String containing valid search option chosen in search bar/dropdown.
     """
     try:
-        file_name = f"channels/{sat}/{sat}.csv"
-        obj = AWS_CLIENT.get_object(Bucket=AWS_BUCKET_NAME, Key=file_name)
-        df = pd.read_csv(obj['Body'])
+        df = utilities.read_channel_table(AWS_CLIENT, AWS_BUCKET_NAME, sat)
     except Exception as e:
         return []
     return df.to_dict("records")
@@ -273,9 +263,8 @@ def update_map(n_clicks, value, satellite,latitude, longitude, location):
                     AWS_CLIENT, AWS_BUCKET_NAME, source_path)
 
                 if does_exist:
-                    obj = AWS_CLIENT.get_object(
-                        Bucket=AWS_BUCKET_NAME, Key=source_path)["Body"]
-                    df = pd.read_csv(obj, header=0)
+                    df = utilities.read_dataframe(
+                        AWS_CLIENT, AWS_BUCKET_NAME, source_path)
 
                     if satellite in df.iloc[:, 0].values:
                         df_subset = df[df.iloc[:, 0] == satellite]
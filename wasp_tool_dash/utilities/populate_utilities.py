@@ -17,6 +17,8 @@ FUNCTIONS
         Populates the 'Footprints' tab with footprints images and image titles.
     def populate_freq_plans(aws_client: botocore.client, aws_bucket: str, sat: str, key: str):
         Populates the 'Frequency Plans' tab with frequency plan images.
+    def create_page_document(page_urls: list, page_sizes: list) -> str:
+        Creates an html document showing page images that load as they are scrolled to.
     def populate_channels(aws_client: botocore.client, aws_bucket: str, sat: str, key: str):
         Populates the 'Channels' tab including the column filter and filter by values as well as
         the Dash datatable.
@@ -31,6 +33,7 @@ from dash import html
 from dash import dcc
 from PIL import Image
 import re
+from html import escape
 from wasp_tool_dash import utilities
 from urllib.parse import urlparse
 from config import KEY, SECRET_KEY
@@ -111,11 +114,7 @@ def populate_inputs(aws_client: botocore.client, aws_bucket: str,  key: str) ->
     source_path = f"{key}satbeams.csv"
     does_exist = utilities.prefix_exists(aws_client, aws_bucket, source_path)
     if does_exist:
-        obj = (
-            aws_client.get_object(Bucket=aws_bucket, Key=source_path)["Body"]
-
-        )
-        df = pd.read_csv(obj, header=0)
+        df = utilities.read_dataframe(aws_client, aws_bucket, source_path)
     accepted_inputs = df.iloc[:, 0].tolist()
     accepted_inputs.sort()
     return accepted_inputs
@@ -147,11 +146,7 @@ def populate_general_info(aws_client: botocore.client, aws_bucket: str, sat: str
         source_path = f"{key}satbeams.csv"
         does_exist = utilities.prefix_exists(aws_client, aws_bucket, source_path)
         if does_exist:
-            obj = (
-                aws_client.get_object(Bucket=aws_bucket, Key=source_path)["Body"]
-
-            )
-            df = pd.read_csv(obj, header=0)
+            df = utilities.read_dataframe(aws_client, aws_bucket, source_path)
 
             if norad in df.iloc[:, 3].values:
                 df_subset = df[df.iloc[:, 3] == norad]
@@ -205,11 +200,7 @@ def populate_tles(
         source_path = f"{key}celestrak.csv"
         does_exist = utilities.prefix_exists(aws_client, aws_bucket, source_path)
         if does_exist:
-            obj = (
-                aws_client.get_object(Bucket=aws_bucket, Key=source_path)["Body"]
-
-            )
-            df = pd.read_csv(obj, header=0)
+            df = utilities.read_dataframe(aws_client, aws_bucket, source_path)
             if norad in df["Norad"].values:
                 df_subset = df[df["Norad"] == norad]
                 tle_1 = df_subset["TLE-1"].tolist()[0]
@@ -251,8 +242,7 @@ def populate_footprints(
         csv_path = f"{key}satbeams.csv"
         does_exist = utilities.prefix_exists(aws_client, aws_bucket, csv_path)
         if does_exist:
-            obj = aws_client.get_object(Bucket=aws_bucket, Key=csv_path)["Body"]
-            df = pd.read_csv(obj, header=0)
+            df = utilities.read_dataframe(aws_client, aws_bucket, csv_path)
 
             if norad in df.iloc[:, 3].values:
                 df_subset = df[df.iloc[:, 3] == norad]
@@ -261,13 +251,29 @@ def populate_footprints(
                 titles = eval(df_subset.iloc[0, 6])
                 urls = extract_jpg_urls(image_keys)
 
+                # footprints mirrored by the backend load from our own storage
+                footprint_index = utilities.get_published_index(
+                    aws_client, aws_bucket, key + utilities.FOOTPRINT_INDEX_KEY
+                )
+
                 # Create clickable buttons and preview windows for each URL
                 children = []
                 for title, url in zip(titles, urls):
+                    content = html.Button(title)  # Display title as button text
+                    entry = footprint_index.get(url)
+                    if entry is not None:
+                        url = utilities.get_object_url(aws_client, aws_bucket, entry["image"])
+                        thumbnail_url = utilities.get_object_url(
+                            aws_client, aws_bucket, entry["thumbnail"]
+                        )
+                        content = html.Div([
+                            html.Img(src=thumbnail_url, alt=title, style={"width": "100%"}),
+                            html.Button(title),
+                        ])
 
                     children.append(
                         html.A(
-                            html.Button(title),  # Display title as button text
+                            content,
                             href=url,
                             target="_blank",  # Open in a new tab
                             style={
@@ -342,19 +348,31 @@ def populate_freq_plans(
         csv_path = f"{key}altervista.csv"
         does_exist = utilities.prefix_exists(aws_client, aws_bucket, csv_path)
         if does_exist:
-            obj = (
-                aws_client.get_object(Bucket=aws_bucket, Key=csv_path)["Body"]
-
-            )
-        df = pd.read_csv(obj, header=0)
+            df = utilities.read_dataframe(aws_client, aws_bucket, csv_path)
         if sat in df["Primary Satellite"].values:
             df_subset = df[df["Primary Satellite"] == sat]
             image_url = df_subset["Frequency Plan URL"].values[0]
             menlo_url = "https://safe.menlosecurity.com/" +image_url[len("http://"):]
 
+            # frequency plans rendered by the backend load page by page from our own storage
+            viewer = html.Iframe(src=image_url, style={'width': '100%', 'height': '500px'})
+            plan = utilities.get_published_index(
+                aws_client, aws_bucket, key + utilities.FREQUENCY_PLAN_INDEX_KEY
+            ).get(sat)
+            if plan is not None:
+                page_urls = [
+                    utilities.get_object_url(aws_client, aws_bucket, page["key"])
+                    for page in plan["pages"]
+                ]
+                page_sizes = [(page["width"], page["height"]) for page in plan["pages"]]
+                viewer = html.Iframe(
+                    srcDoc=create_page_document(page_urls, page_sizes),
+                    style={'width': '100%', 'height': '800px', 'border': 'none'},
+                )
+                image_url = utilities.get_object_url(aws_client, aws_bucket, plan["pdf"])
+
             return html.Div([
-                html.Iframe(src=image_url, style={
-                            'width': '100%', 'height': '500px'}),html.Br(),
+                viewer, html.Br(),
                 html.A("Click here to view the Frequency Plans on NIPR", href=menlo_url, target="_blank", style={
                     'font-size': '20px', 'color': '#00263A', 'text-decoration': 'underline'}),html.Br(),
                 html.A("Click here to view the Frequency Plans if not diplayed", href=image_url, target="_blank", style={
@@ -365,6 +383,31 @@ def populate_freq_plans(
         return html.P("Populate data sources to obtain requested information.", style=STYLE_INFO)
 
 
+def create_page_document(page_urls: list, page_sizes: list) -> str:
+    """
+    Creates an html document showing page images that load as they are scrolled to.
+
+    Parameters
+    ----------
+    page_urls: list
+        List of page image urls
+    page_sizes: list
+        List of (width, height) tuples of the page images, so the browser reserves each
+        page's space before it loads
+
+    Returns
+    -------
+    str
+        String containing the html document
+    """
+    images = [
+        f'<img src="{escape(url)}" width="{width}" height="{height}" loading="lazy" '
+        f'alt="Page {number}" style="width:100%;height:auto;display:block;margin-bottom:10px">'
+        for number, (url, (width, height)) in enumerate(zip(page_urls, page_sizes), start=1)
+    ]
+    return '<html><body style="margin:0">' + "".join(images) + "</body></html>"
+
+
 def populate_channels(aws_client: botocore.client, aws_bucket: str, sat: str, norad: str, key: str):
     """
     Populates the 'Channels' tab including the column filter and filter by values as well as
@@ -396,21 +439,15 @@ def populate_channels(aws_client: botocore.client, aws_bucket: str, sat: str, no
     does_exist = utilities.prefix_exists(aws_client, aws_bucket, csv_path)
     if does_exist:
         try:
-            obj_lyngsat = aws_client.get_object(
-                Bucket=aws_bucket, Key=csv_path)["Body"]
+            df = utilities.read_dataframe(aws_client, aws_bucket, csv_path)
         except:
             return html.P("Information not available.", style=STYLE_INFO)
-        
 
-        df = pd.read_csv(obj_lyngsat, header=0)
         # Apply the function to the entire column
         # df["Primary Satellite Name"] = df["Primary Satellite Name"].apply(lambda x: sat if x == 'Satellite' else x)
 
         if sat in df["Primary Satellite Name"].values:
-            source_path = f"{key}channels/{sat}/{sat}.csv"
-            obj = aws_client.get_object(
-                Bucket=aws_bucket, Key=source_path)["Body"]
-            df_lyngsat = pd.read_csv(obj, header=0)
+            df_lyngsat = utilities.read_channel_table(aws_client, aws_bucket, sat, key)
             children = [html.Div(utilities.create_data_table(
                 df_lyngsat), style=STYLE_DATA_TABLE)]
             return html.Div(children=children)
@@ -446,15 +483,12 @@ def dish_pointer(aws_client: botocore.client, aws_bucket: str, norad: str, latit
     # Load satellite data from S3
     source_path = f"satbeams.csv"
     if utilities.prefix_exists(aws_client, aws_bucket, source_path):
-        obj = aws_client.get_object(Bucket=aws_bucket, Key=source_path)["Body"]
-        df = pd.read_csv(obj, header=0)
+        df = utilities.read_dataframe(aws_client, aws_bucket, source_path)
 
         # Get Celestrak data
         source_path = f"celestrak.csv"
         if utilities.prefix_exists(aws_client, aws_bucket, source_path):
-            obj = aws_client.get_object(
-                Bucket=aws_bucket, Key=source_path)["Body"]
-            df = pd.read_csv(obj, header=0)
+            df = utilities.read_dataframe(aws_client, aws_bucket, source_path)
 
             # Calculate azimuth and elevation
             if norad in df["Norad"].values:
@@ -2,6 +2,10 @@
 This module defines functions for navigating and creating directories,
 encoding images, and checking file status and retreiving file keys from the AWS bucket.
 
+Datasets published by the backend are resolved through its manifest.json, which maps each
+dataset key to an immutable snapshot object. Dataframes are cached by snapshot object, so
+they are only downloaded again once the manifest points at a new snapshot.
+
 FUNCTIONS
     def get_project_path() -> Path:
         Return a new path object representing the current directory.
@@ -20,17 +24,102 @@ FUNCTIONS
         file_extension: str
     ) -> list:
         Retrieve item paths of a given prefix and file type from the AWS bucket.
+    def read_dataframe(
+        aws_client: botocore.client,
+        aws_bucket: str,
+        key: str
+    ) -> pd.DataFrame:
+        Reads a csv dataset from the AWS bucket, preferring its parquet copy when present.
+    def read_channel_table(
+        aws_client: botocore.client,
+        aws_bucket: str,
+        sat: str,
+        prefix: str
+    ) -> pd.DataFrame:
+        Reads a satellite's channels table from the consolidated channels file.
+    def get_channel_index(aws_client: botocore.client, aws_bucket: str, prefix: str) -> dict:
+        Return the satellite index of the consolidated channels file.
+    def read_snapshot_dataframe(
+        aws_client: botocore.client,
+        aws_bucket: str,
+        snapshot_key: str
+    ) -> pd.DataFrame:
+        Reads a csv or parquet snapshot object, caching the dataframe.
+    def resolve_key(aws_client: botocore.client, aws_bucket: str, key: str) -> str:
+        Return the snapshot object holding a dataset key's current content.
+    def get_manifest_entry(aws_client: botocore.client, aws_bucket: str, key: str) -> dict:
+        Return the manifest entry of a dataset key.
+    def get_manifest(aws_client: botocore.client, aws_bucket: str) -> dict:
+        Return the backend's manifest, checking for a new one at most every
+        MANIFEST_MAX_AGE seconds.
+    def get_published_index(aws_client: botocore.client, aws_bucket: str, key: str) -> dict:
+        Return a json index published by the backend, e.g. its mirrored footprint images.
+    def get_object_url(aws_client: botocore.client, aws_bucket: str, key: str) -> str:
+        Return a presigned url the browser can load an object from.
 """
 
 import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
 
 import botocore
+import numpy as np
+import pandas as pd
 from dash import html
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut
 from config import API_KEY
 
+# define seconds before a dataset without a parquet copy is checked for one again
+PARQUET_RECHECK_INTERVAL = 5 * 60
+
+# define time each dataset was last found without a parquet copy
+PARQUET_MISSING = {}
+
+# define key of the consolidated channels file index written by the backend
+CHANNEL_INDEX_KEY = "channels_index.json"
+
+# define seconds a loaded channels index is used before it is loaded again
+CHANNEL_INDEX_MAX_AGE = 5 * 60
+
+# define loaded channels index of each prefix, the time it was loaded and its key
+CHANNEL_INDEXES = {}
+
+# define key of the manifest written by the backend
+MANIFEST_KEY = "manifest.json"
+
+# define seconds a loaded manifest is used before checking for a new one
+MANIFEST_MAX_AGE = 30
+
+# define loaded manifest, its etag and the time it was last checked
+MANIFEST_CACHE = {"checked": 0, "etag": None, "manifest": None}
+
+# define number of snapshot dataframes kept in memory
+DATAFRAME_CACHE_SIZE = 32
+
+# define dataframes of the most recently read snapshot objects
+DATAFRAME_CACHE = OrderedDict()
+
+# define keys of the footprint and frequency plan indexes written by the backend
+FOOTPRINT_INDEX_KEY = "footprints_index.json"
+FREQUENCY_PLAN_INDEX_KEY = "frequency_plans_index.json"
+
+# define loaded published indexes and their snapshot keys
+PUBLISHED_INDEXES = {}
+
+# define seconds a presigned url is valid, and for how long the same url is handed out
+PRESIGNED_URL_EXPIRY = 2 * 24 * 60 * 60
+PRESIGNED_URL_MAX_AGE = 24 * 60 * 60
+
+# define presigned url of each object and the time it was created
+PRESIGNED_URLS = {}
+
+CACHE_LOCK = threading.Lock()
+
 
 def get_project_path() -> Path:
     """
@@ -84,6 +173,8 @@ def prefix_exists(aws_client: botocore.client, aws_bucket: str, key: str) -> boo
         True if prefix exists
         False otherwise
     """
+    if get_manifest_entry(aws_client, aws_bucket, key) is not None:
+        return True
     try:
         aws_client.head_object(Bucket=aws_bucket, Key=key)
         return True
@@ -127,6 +218,338 @@ def get_file_keys(
     return file_keys
 
 
+def read_dataframe(aws_client: botocore.client, aws_bucket: str, key: str) -> pd.DataFrame:
+    """
+    Reads a csv dataset from the AWS bucket, preferring its parquet copy when present.
+
+    The backend writes the parquet copy next to the csv file when run with --parquet.
+    It is smaller and its columns are already typed, so it downloads and loads faster.
+    Datasets listed in the manifest are read from their snapshot objects. Datasets
+    published before the manifest existed are probed for a parquet copy, and those
+    without one are not checked again for PARQUET_RECHECK_INTERVAL seconds.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    key: str
+        String containing the key of the csv file
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe of the dataset
+    """
+    parquet_key = key[: -len(".csv")] + ".parquet"
+    csv_entry = get_manifest_entry(aws_client, aws_bucket, key)
+    if csv_entry is not None:
+        parquet_entry = get_manifest_entry(aws_client, aws_bucket, parquet_key)
+        if parquet_entry is not None:
+            try:
+                return read_snapshot_dataframe(aws_client, aws_bucket, parquet_entry["key"])
+            # pyarrow is not installed
+            except ImportError:
+                pass
+        return read_snapshot_dataframe(aws_client, aws_bucket, csv_entry["key"])
+
+    if time.time() - PARQUET_MISSING.get(parquet_key, 0) > PARQUET_RECHECK_INTERVAL:
+        try:
+            obj = aws_client.get_object(Bucket=aws_bucket, Key=parquet_key)["Body"].read()
+            df = pd.read_parquet(BytesIO(obj))
+            # missing strings are read as None, the csv reader reads them as NaN
+            return df.fillna(np.nan)
+        # the parquet copy is missing or pyarrow is not installed
+        except (botocore.exceptions.ClientError, ImportError):
+            PARQUET_MISSING[parquet_key] = time.time()
+    obj = aws_client.get_object(Bucket=aws_bucket, Key=key)["Body"]
+    return pd.read_csv(obj, header=0)
+
+
+def read_channel_table(
+    aws_client: botocore.client, aws_bucket: str, sat: str, prefix: str = ""
+) -> pd.DataFrame:
+    """
+    Reads a satellite's channels table from the consolidated channels file.
+
+    Only the satellite's rows are downloaded, using a range request at the offset
+    recorded in the index. Satellites missing from the index, or a consolidated file
+    that no longer matches the index, fall back to the satellite's own csv file.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    sat: str
+        String containing the satellite's primary name
+    prefix: str
+        String containing prefix of the AWS bucket keys
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe of the satellite's channels
+    """
+    index = get_channel_index(aws_client, aws_bucket, prefix)
+    if index is not None and sat in index["satellites"]:
+        offset, length = index["satellites"][sat]
+        rows = b""
+        if length:
+            response = aws_client.get_object(
+                Bucket=aws_bucket,
+                Key=resolve_key(aws_client, aws_bucket, prefix + index["key"]),
+                Range=f"bytes={offset}-{offset + length - 1}",
+            )
+            rows = response["Body"].read()
+            # the consolidated file was rewritten since the index was loaded
+            if not response.get("ContentRange", "").endswith(f"/{index['size']}"):
+                CHANNEL_INDEXES.pop(prefix, None)
+                rows = None
+        if rows is not None:
+            text = index["header"].encode("utf-8") + rows
+            return pd.read_csv(BytesIO(text), header=0).drop(columns="Satellite")
+    return read_dataframe(aws_client, aws_bucket, f"{prefix}channels/{sat}/{sat}.csv")
+
+
+def get_channel_index(aws_client: botocore.client, aws_bucket: str, prefix: str = "") -> dict:
+    """
+    Return the satellite index of the consolidated channels file.
+
+    The index is loaded again when the manifest points at a new snapshot of it, and at
+    least once every CHANNEL_INDEX_MAX_AGE seconds.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    prefix: str
+        String containing prefix of the AWS bucket keys
+
+    Returns
+    -------
+    index: dict
+        Dictionary containing the key, size and header of the consolidated file and the
+        [offset, length] byte range of each satellite's rows, None if there is no index
+    """
+    index_key = resolve_key(aws_client, aws_bucket, prefix + CHANNEL_INDEX_KEY)
+    loaded_time, loaded_key, index = CHANNEL_INDEXES.get(prefix, (0, None, None))
+    if loaded_key != index_key or time.time() - loaded_time > CHANNEL_INDEX_MAX_AGE:
+        try:
+            obj = aws_client.get_object(Bucket=aws_bucket, Key=index_key)
+            index = json.loads(obj["Body"].read())
+        except (botocore.exceptions.ClientError, ValueError):
+            index = None
+        CHANNEL_INDEXES[prefix] = (time.time(), index_key, index)
+    return index
+
+
+def read_snapshot_dataframe(
+    aws_client: botocore.client, aws_bucket: str, snapshot_key: str
+) -> pd.DataFrame:
+    """
+    Reads a csv or parquet snapshot object, caching the dataframe.
+
+    Snapshot objects are never overwritten, so a cached dataframe never goes stale.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    snapshot_key: str
+        String containing the key of the snapshot object
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of the cached dataframe, callers may modify it
+    """
+    with CACHE_LOCK:
+        df = DATAFRAME_CACHE.get(snapshot_key)
+        if df is not None:
+            DATAFRAME_CACHE.move_to_end(snapshot_key)
+    if df is None:
+        body = aws_client.get_object(Bucket=aws_bucket, Key=snapshot_key)["Body"].read()
+        if snapshot_key.endswith(".parquet"):
+            # missing strings are read as None, the csv reader reads them as NaN
+            df = pd.read_parquet(BytesIO(body)).fillna(np.nan)
+        else:
+            df = pd.read_csv(BytesIO(body), header=0)
+        with CACHE_LOCK:
+            DATAFRAME_CACHE[snapshot_key] = df
+            while len(DATAFRAME_CACHE) > DATAFRAME_CACHE_SIZE:
+                DATAFRAME_CACHE.popitem(last=False)
+    return df.copy()
+
+
+def resolve_key(aws_client: botocore.client, aws_bucket: str, key: str) -> str:
+    """
+    Return the snapshot object holding a dataset key's current content.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    key: str
+        String containing the dataset key, e.g. "satbeams.csv"
+
+    Returns
+    -------
+    str
+        String containing the key of the snapshot object, the dataset key itself if it
+        is not listed in the manifest
+    """
+    entry = get_manifest_entry(aws_client, aws_bucket, key)
+    if entry is None:
+        return key
+    return entry["key"]
+
+
+def get_manifest_entry(aws_client: botocore.client, aws_bucket: str, key: str) -> dict:
+    """
+    Return the manifest entry of a dataset key.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    key: str
+        String containing the dataset key, e.g. "satbeams.csv"
+
+    Returns
+    -------
+    dict
+        Dictionary containing the key, size, sha256 hash and version of the snapshot
+        object, None if there is no manifest or the key is not listed
+    """
+    manifest = get_manifest(aws_client, aws_bucket)
+    if manifest is None:
+        return None
+    return manifest["objects"].get(key)
+
+
+def get_manifest(aws_client: botocore.client, aws_bucket: str) -> dict:
+    """
+    Return the backend's manifest, checking for a new one at most every
+    MANIFEST_MAX_AGE seconds.
+
+    The check is a conditional request, so an unchanged manifest is not downloaded.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+
+    Returns
+    -------
+    manifest: dict
+        Dictionary containing the manifest version, update time and objects, None if
+        the backend has not published a manifest
+    """
+    with CACHE_LOCK:
+        if time.time() - MANIFEST_CACHE["checked"] <= MANIFEST_MAX_AGE:
+            return MANIFEST_CACHE["manifest"]
+        MANIFEST_CACHE["checked"] = time.time()
+        etag = MANIFEST_CACHE["etag"]
+
+    arguments = {"IfNoneMatch": etag} if etag else {}
+    try:
+        obj = aws_client.get_object(Bucket=aws_bucket, Key=MANIFEST_KEY, **arguments)
+        manifest = json.loads(obj["Body"].read())
+        etag = obj["ETag"]
+    except botocore.exceptions.ClientError as error:
+        # the manifest has not changed since it was loaded
+        if error.response["Error"]["Code"] in ("304", "NotModified"):
+            return MANIFEST_CACHE["manifest"]
+        manifest, etag = None, None
+    except ValueError:
+        manifest, etag = None, None
+    with CACHE_LOCK:
+        MANIFEST_CACHE["manifest"] = manifest
+        MANIFEST_CACHE["etag"] = etag
+    return manifest
+
+
+def get_published_index(aws_client: botocore.client, aws_bucket: str, key: str) -> dict:
+    """
+    Return a json index published by the backend, e.g. its mirrored footprint images.
+
+    The index is only loaded again once the manifest points at a new snapshot of it.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    key: str
+        String containing the dataset key of the index, e.g. FOOTPRINT_INDEX_KEY
+
+    Returns
+    -------
+    index: dict
+        Dictionary of the index, empty if the backend has not published it
+    """
+    entry = get_manifest_entry(aws_client, aws_bucket, key)
+    if entry is None:
+        return {}
+    with CACHE_LOCK:
+        loaded_key, index = PUBLISHED_INDEXES.get(key, (None, None))
+    if loaded_key != entry["key"]:
+        obj = aws_client.get_object(Bucket=aws_bucket, Key=entry["key"])
+        index = json.loads(obj["Body"].read())
+        with CACHE_LOCK:
+            PUBLISHED_INDEXES[key] = (entry["key"], index)
+    return index
+
+
+def get_object_url(aws_client: botocore.client, aws_bucket: str, key: str) -> str:
+    """
+    Return a presigned url the browser can load an object from.
+
+    The same url is handed out for PRESIGNED_URL_MAX_AGE seconds, so browsers can cache
+    the object.
+
+    Parameters
+    ----------
+    aws_client: botocore.client
+        AWS boto3 client object
+    aws_bucket: str
+        AWS bucket name
+    key: str
+        String containing the key of the object
+
+    Returns
+    -------
+    str
+        String containing the presigned url, valid for at least
+        PRESIGNED_URL_EXPIRY - PRESIGNED_URL_MAX_AGE seconds
+    """
+    with CACHE_LOCK:
+        created_time, url = PRESIGNED_URLS.get(key, (0, None))
+    if time.time() - created_time > PRESIGNED_URL_MAX_AGE:
+        url = aws_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": aws_bucket, "Key": key},
+            ExpiresIn=PRESIGNED_URL_EXPIRY,
+        )
+        with CACHE_LOCK:
+            PRESIGNED_URLS[key] = (time.time(), url)
+    return url
+
+
 def get_location_data(location):
     """
     Fetch latitude, longitude, azimuth, elevation, and map source using geopy.